@@ -0,0 +1,153 @@
+"""
+    This module provides batched detection over many runs.
+
+    The speed matrices of the runs are stacked into one padded (runs x samples x vehicles) array with the length of each run. Statistics, changing samples and transitions are computed for all the runs in single vectorized passes of the array kernels (see engines.py), and the events are split back per run. The per call overhead of the pipeline is paid once per batch instead of once per run, which pays off on corpora with many short runs.
+
+    Padding samples are ``NaN``, so that rolling windows and column statistics of each run ignore them, and windows running past the end of a run are masked. Results are identical to running the same engine on each run.
+
+    Example:
+        Transition events of the PoC runs ::
+
+            >>> from glob import glob
+            >>> from collector.loader import PrefetchLoader
+            >>> from collector.batch import batched_detection
+            >>> runs = {e.datahandler._experiment: e.data for e in PrefetchLoader(glob('data/raw/poc/*/*.csv'))}
+            >>> batched_detection(runs, windowSize=20)
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from .constants import COLUMNS_TIME, STANDARD_SPEED_COLUMNS
+from .engines import resolve_engine, get_kernels, window_bounds
+from .events import TransitionEvents
+from .generic import compute_reaction_instants, response_time_table
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+# Number of runs stacked together (bounds the memory of the stacked windows)
+BATCH_SIZE = 16
+
+
+def stack_runs(runs, columns=STANDARD_SPEED_COLUMNS):
+    """
+        Stack runs into padded arrays.
+
+        Args:
+            runs(list): Standardized and cleaned runs (DataFrames)
+
+        Returns:
+            Times (runs x samples), values (runs x samples x columns) padded with ``NaN``, and the length of each run
+    """
+    lengths = np.array([len(data) for data in runs], dtype=np.int64)
+    n_samples = int(lengths.max()) if len(runs) else 0
+    times = np.full((len(runs), n_samples), np.nan)
+    values = np.full((len(runs), n_samples, len(columns)), np.nan)
+    for r, data in enumerate(runs):
+        times[r, : lengths[r]] = data[COLUMNS_TIME[0]].to_numpy(dtype=float)
+        values[r, : lengths[r]] = data[columns].to_numpy(dtype=float)
+    return times, values, lengths
+
+
+def _to_columns(values):
+    """
+        (runs x samples x vehicles) -> (samples x runs.vehicles), the layout of the array kernels
+    """
+    n_runs, n_samples, n_vehicles = values.shape
+    return values.transpose(1, 0, 2).reshape(n_samples, n_runs * n_vehicles)
+
+
+def _from_columns(values, n_runs):
+    n_samples = values.shape[0]
+    return values.reshape(n_samples, n_runs, -1).transpose(1, 0, 2)
+
+
+def batched_transitions(speeds, lengths, windowSize=10, windowForward=20, engine="numpy"):
+    """
+        Transition masks of a stack of runs
+
+        Args:
+            speeds(array): Padded speeds (runs x samples x vehicles), see ``stack_runs``
+            lengths(array): Number of samples of each run
+            windowSize(int): Samples of the moving average window
+            windowForward(int): Samples of the forward detection window
+            engine(str): ``numpy`` or ``numba``
+
+        Returns:
+            Statistics (dictionary of runs x samples x vehicles arrays) and transition masks (runs x samples x vehicles)
+    """
+    if resolve_engine(engine) == "pandas":
+        raise ValueError("Batched detection runs on the numpy or numba engine")
+    if not all(isinstance(window, (int, np.integer)) for window in (windowSize, windowForward)):
+        raise ValueError("Batched detection requires windows in samples, resample time based runs first")
+
+    kernels = get_kernels(engine)
+    n_runs, n_samples, n_vehicles = speeds.shape
+    indexer = pd.api.indexers.FixedForwardWindowIndexer
+
+    stats = kernels.speed_statistics(_to_columns(speeds), *window_bounds(indexer(window_size=windowSize), n_samples))
+    boundsForward = window_bounds(indexer(window_size=windowForward), n_samples)
+    changing = kernels.changing_samples(stats["abs_derivative_sd"], *boundsForward)
+
+    # Forward windows must end within their run
+    complete = np.arange(n_samples)[None, :] + windowForward <= lengths[:, None]
+    valid = _to_columns(np.repeat(complete[:, :, None], n_vehicles, axis=2))
+    transitions = kernels.transition_samples(changing, stats["derivative"], *boundsForward, valid)
+
+    stats = {key: _from_columns(value, n_runs) for key, value in stats.items()}
+    return stats, _from_columns(transitions, n_runs)
+
+
+def batched_detection(runs, windowSize=10, windowForward=20, engine="numpy", batch_size=BATCH_SIZE):
+    """
+        Transition events of many runs, computed by batches of stacked runs.
+
+        Runs are sorted by length before batching to limit the padding.
+
+        Args:
+            runs(dict): ``{name: data}`` standardized and cleaned runs
+            batch_size(int): Number of runs per batch
+
+        Returns:
+            ``{name: TransitionEvents}`` in the order of ``runs``
+    """
+    names = sorted(runs, key=lambda name: len(runs[name]))
+    events = {}
+    for first in range(0, len(names), max(batch_size, 1)):
+        batch = names[first : first + max(batch_size, 1)]
+        times, speeds, lengths = stack_runs([runs[name] for name in batch])
+        _, transitions = batched_transitions(speeds, lengths, windowSize, windowForward, engine)
+        for r, name in enumerate(batch):
+            events[name] = TransitionEvents.from_masks(times[r, : lengths[r]], transitions[r, : lengths[r]])
+    return {name: events[name] for name in runs}
+
+
+def batched_response_times(runs, reference="leader", **kwargs):
+    """
+        Response times of many runs with batched detection.
+
+        Args:
+            runs(dict): ``{name: data}`` standardized and cleaned runs
+            reference(str): ``leader`` for response times (i-1, i), ``head`` for response times (0, i)
+            kwargs: Passed to ``batched_detection``
+
+        Returns:
+            Long DataFrame ``experiment``, ``Platoon ID``, ``Response time``
+    """
+    results = []
+    for name, events in batched_detection(runs, **kwargs).items():
+        rtdf = response_time_table(compute_reaction_instants(events), reference)
+        rtdf.insert(0, "experiment", name)
+        results.append(rtdf)
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
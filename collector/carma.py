@@ -13,6 +13,7 @@
 # STANDARD  IMPORTS
 # ============================================================================
 
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 from decouple import config
@@ -35,6 +36,7 @@ from .constants import (
     changes,
     detection,
 )
+from .schema import read_csv
 #from .generic import standardize_dataframe, compute_statistics, detect_transition_times, consecutive_times
 
 # ============================================================================
@@ -66,9 +68,9 @@ class CarmaData:
     # LOCAL METHODS
     # ============================================================================
 
-    def _load_data_from_csv(self, csv_path: str = ""):
+    def _load_data_from_csv(self, csv_path: str = "", features: list = None):
         """
-            Load csv data from the full path. 
+            Load csv data from the full path. Time, speed and spacing columns are always loaded, ``features`` adds columns or per vehicle variables of the dataset schema (see schema.py)
 
             Examples: 
                 Loading a file in `csvpath`::
@@ -79,21 +81,18 @@ class CarmaData:
         self._csvpath = csv_path if not self._csvpath else self._csvpath
         self._experiment = self._csvpath.split("/")[-1].split(".")[-2]
         cols_to_load = COLUMNS_SPACING_CARMA + COLUMNS_SPEED_CARMA + COLUMNS_TIME_CARMA
-        self._csvdata = pd.read_csv(self._csvpath, usecols=cols_to_load, sep=",", decimal=".")
+        self._csvdata = read_csv(self._csvpath, cols_to_load, features, dataset="carma")
 
     def _distance_to_leader(self):
         """ 
             From available local processed datasets define the function computes the headway spacing: 
         """
 
-        def clean_col(df):
-            for i in (1, 2, 3, 4):
-                if i == 1:
-                    df[f"distToLeader_f{i}"] = df[f"follower{i}_radar1"]
-                else:
-                    df[f"distToLeader_f{i}"] = df[f"follower{i-1}_radar1"] + df[f"follower{i}_radar1"]
-
-        self._csvdata.apply(clean_col, axis=0)
+        # Each radar measures the gap to the predecessor: distance to leader is the cumulative sum
+        radar = self._csvdata[COLUMNS_SPACING_CARMA].to_numpy(dtype=float)
+        cumulative = np.cumsum(radar, axis=1)
+        for i in (1, 2, 3, 4):
+            self._csvdata[f"distToLeader_f{i}"] = cumulative[:, i - 1]
 
     def _clean_data(self):
         """
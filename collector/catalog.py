@@ -0,0 +1,172 @@
+"""
+    This module provides a catalog of the runs available in the raw data folder.
+
+    The catalog scans ``data/raw`` once and records per run metadata (mode, duration, number of samples, sampling rate, columns present, NaN ratio of the speed of each vehicle and file hash) in ``catalog.json``. Later scans only open new or modified files. Runs are then selected by query without reading the csv files.
+
+    Example:
+        To process the CACC runs longer than 5 minutes ::
+
+            >>> from collector.catalog import Catalog
+            >>> from collector.summary import summarize_runs
+            >>> catalog = Catalog().scan()
+            >>> summarize_runs(catalog.paths("mode == 'cacc' and duration > 300"))
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import os
+import json
+import hashlib
+from glob import glob
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from .constants import COLUMNS_SPEED_CARMA, COLUMNS_SPEED_POC, COLUMNS_TIME_CARMA, COLUMNS_TIME_POC
+from .schema import experiment_mode, read_csv
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+RAW_DATA = "data/raw"
+CATALOG_FILE = "catalog.json"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+        SHA-256 of a file, read by chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run_metadata(csvpath, root=None):
+    """
+        Metadata of a run. Only the time and speed columns are parsed, the mode is read from the path relative to ``root`` (see ``experiment_mode``)
+    """
+    mode = experiment_mode(csvpath, root)
+    dataset = "carma" if mode == "carma" else "poc"
+    if dataset == "carma":
+        time_col, speed_cols = COLUMNS_TIME_CARMA[0], COLUMNS_SPEED_CARMA
+    else:
+        time_col, speed_cols = COLUMNS_TIME_POC[0], COLUMNS_SPEED_POC
+
+    columns = pd.read_csv(csvpath, nrows=0).columns.tolist()
+    data = read_csv(csvpath, [col for col in [time_col] + speed_cols if col in columns], dataset=dataset)
+
+    time = data[time_col].to_numpy(dtype=float) if time_col in data else np.empty(0)
+    time = time[~np.isnan(time)]
+    steps = np.diff(np.sort(time))
+    steps = steps[steps > 0]
+
+    metadata = {
+        "experiment": os.path.splitext(os.path.basename(csvpath))[0],
+        "mode": mode,
+        "samples": len(data),
+        "duration": float(time.max() - time.min()) if len(time) else 0.0,
+        "rate": float(1 / np.median(steps)) if len(steps) else np.nan,
+        "columns": columns,
+    }
+    for vehid, col in enumerate(speed_cols):
+        metadata[f"nan_{vehid}"] = float(data[col].isna().mean()) if col in data and len(data) else 1.0
+    return metadata
+
+
+class Catalog:
+    """
+        Index of the runs under ``root``, stored in ``root/catalog.json``
+
+        Example:
+            Runs having the acceleration of the vehicles, less than 5% of missing speeds for the tail ::
+
+                >>> catalog = Catalog().scan()
+                >>> catalog.paths("nan_4 < 0.05", columns=["leader_acceleration"])
+    """
+
+    def __init__(self, root: str = RAW_DATA, path: str = None):
+        self.root = root
+        self.path = os.path.join(root, CATALOG_FILE) if path is None else path
+        self._runs = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self._runs = json.load(f)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.root}, {len(self._runs)} runs)"
+
+    def __len__(self):
+        return len(self._runs)
+
+    def scan(self, pattern="**/*.csv"):
+        """
+            Update the catalog with the csv files under ``root``. Files whose size and modification time are unchanged are not opened, entries of deleted files are dropped
+        """
+        found = {os.path.relpath(p, self.root): p for p in glob(os.path.join(self.root, pattern), recursive=True)}
+
+        for key in set(self._runs) - set(found):
+            del self._runs[key]
+
+        for key, csvpath in sorted(found.items()):
+            csvpath = os.path.abspath(csvpath)
+            stat = os.stat(csvpath)
+            entry = self._runs.get(key)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                # The root may have been moved since the entry was recorded
+                entry["path"] = csvpath
+                continue
+            digest = file_hash(csvpath)
+            if entry and entry["hash"] == digest:
+                entry.update(path=csvpath, mtime=stat.st_mtime)
+                continue
+            self._runs[key] = {
+                "path": csvpath,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "hash": digest,
+                **run_metadata(csvpath, self.root),
+            }
+
+        self.save()
+        return self
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(self._runs, f, indent=1)
+
+    def to_frame(self):
+        """
+            One row per run (indexed by the path relative to ``root``), the columns present are kept as a list
+        """
+        if not self._runs:
+            return pd.DataFrame()
+        return pd.DataFrame.from_dict(self._runs, orient="index").sort_index()
+
+    def select(self, query: str = None, columns: list = None):
+        """
+            Runs matching a query (``DataFrame.query`` syntax over ``mode``, ``duration``, ``samples``, ``rate``, ``nan_i``, ...) and holding all the ``columns``
+        """
+        dfRuns = self.to_frame()
+        if dfRuns.empty:
+            return dfRuns
+        if query:
+            dfRuns = dfRuns.query(query)
+        if columns:
+            dfRuns = dfRuns[dfRuns["columns"].apply(lambda present: set(columns).issubset(present))]
+        return dfRuns
+
+    def paths(self, query: str = None, columns: list = None):
+        """
+            Absolute paths of the selected runs (see ``select``), ready for ``DataHandler``, ``PrefetchLoader`` or ``summarize_runs``
+        """
+        dfRuns = self.select(query, columns)
+        return dfRuns["path"].tolist() if not dfRuns.empty else []
@@ -15,6 +15,10 @@ COLUMNS_TIME = ["Time"]
 # Standard column names
 STANDARD_SPEED_COLUMNS = [f"Speed - {i}" for i in range(5)]
 DCT_STD_SPEED_CSV = dict(zip(COLUMNS_SPEED_CARMA + COLUMNS_SPEED_POC, STANDARD_SPEED_COLUMNS + STANDARD_SPEED_COLUMNS))
+STANDARD_SPACING_COLUMNS = [f"Spacing - {i}" for i in (1, 2, 3, 4)]
+DCT_STD_SPACING_CSV = dict(
+    zip(COLUMNS_SPACING_CARMA + COLUMNS_SPACING_POC, STANDARD_SPACING_COLUMNS + STANDARD_SPACING_COLUMNS)
+)
 
 # Processed derived columns
 standard_speed = lambda veh_id: STANDARD_SPEED_COLUMNS[veh_id]
@@ -25,3 +29,46 @@ derivative_sd_velocity = lambda veh_id: f"{veh_id}_Diff_Std_Speed"
 abs_derivative_sd_velocity = lambda veh_id: f"{veh_id}_Abs_Diff_Std_Leader_Speed"
 changes = lambda veh_id: f"{veh_id}_Change"
 detection = lambda veh_id: f"{veh_id}_Detection"
+standard_spacing = lambda veh_id: STANDARD_SPACING_COLUMNS[veh_id - 1]
+distance_predecessor = lambda veh_id: f"{veh_id}_Dist_Predecessor"
+distance_leader = lambda veh_id: f"{veh_id}_Dist_Leader"
+delta_velocity = lambda veh_id: f"{veh_id}_Delta_Speed"
+
+# Features extracted at reaction instants (column name or function of the vehicle id)
+DEFAULT_EVENT_FEATURES = {
+    "Leader speed": STANDARD_SPEED_COLUMNS[0],
+    "Speed": standard_speed,
+    "Delta speed predecessor": delta_velocity,
+    "Distance predecessor": distance_predecessor,
+    "Distance leader": distance_leader,
+}
+
+# Data schema (see schema.py)
+VEHICLES = ["leader"] + [f"follower{i}" for i in (1, 2, 3, 4)]
+DATA_ELEMENTS = "Data Elements.xlsx"
+
+# Columns of the processed csv in data/raw/carma not described in its Data Elements workbook (name: units)
+CARMA_CSV_ELEMENTS = {"Date": "text", "Heure": "text", "Time": "sec"}
+CARMA_CSV_VEHICLE_ELEMENTS = {
+    "CARMA_mode": "integer",
+    "Speed_command": "m/s",
+    "CARMA_ovr": "bool",
+    "avg_speed_driven_wheels": "m/s",
+    "ACC_speed": "none",
+    "ACC_status": "bool",
+    "GPS_CARMA_speed": "m/s",
+    "GPS_speed": "m/s",
+    "acceleration": "m/s²",
+    "fuel_consumption": "none",
+    "CARMA_ovr_manual": "bool",
+    "radar1": "m",
+    "radar7": "m",
+    "radar9": "m",
+}
+
+# Columns of the PoC csv common to the whole platoon
+POC_RUN_ELEMENTS = ["Run", "bin_utc_time_formatted", "elapsed_time (s)"]
+
+# Data types per units, other units are read as float64
+DCT_UNITS_DTYPE = {"bool": "boolean", "integer": "Int64", "counter": "Int64", "text": "string"}
+TEXT_ELEMENTS = ["Date", "Heure", "LocationDateTime", "veh_color", "bin_utc_time_formatted"]
@@ -0,0 +1,287 @@
+"""
+    This module describes the compute backends for the rolling statistics and the detection kernels in ``generic.py``.
+
+    Available engines:
+
+    * ``pandas``: Reference implementation (see ``generic.py``)
+    * ``numpy``: Vectorized kernels over the (samples x vehicles) matrix
+    * ``numba``: JIT compiled kernels. Falls back to ``numpy`` when Numba is not installed
+
+    All kernels reproduce the pandas conventions for forward windows: a window is evaluated only when it holds at least ``min_periods`` valid samples (``window_size`` of the indexer, ``0`` for time based windows).
+
+    Example:
+        To select a backend for the full pipeline ::
+
+            >>> from collector.handler import DataHandler
+            >>> x = DataHandler('data/raw/carma/data5.csv')
+            >>> x.compute_response_times(engine="numba")
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+ENGINES = ("pandas", "numpy", "numba")
+
+# Percentile used to mark changing samples
+FACTOR_SPEED_CHG = 95
+
+
+def resolve_engine(engine: str = "pandas"):
+    """
+        Validate the engine name. ``numba`` resolves to ``numpy`` when Numba is not installed
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', use one of {ENGINES}")
+    if engine == "numba" and numba is None:
+        return "numpy"
+    return engine
+
+
+def get_kernels(engine: str = "numpy"):
+    """
+        Kernels implementing the array backend ``engine``
+    """
+    engine = resolve_engine(engine)
+    if engine == "pandas":
+        raise ValueError("The pandas engine is implemented in generic.py")
+    return {"numpy": NumpyKernels, "numba": NumbaKernels}[engine]
+
+
+def window_bounds(indexer, num_values: int):
+    """
+        Start/end positions and minimum number of valid samples of the windows defined by a pandas indexer
+    """
+    start, end = indexer.get_window_bounds(num_values=num_values)
+    return np.asarray(start, dtype=np.int64), np.asarray(end, dtype=np.int64), indexer.window_size
+
+
+def _gather(values, start, end):
+    """
+        Stack the windows into a (samples x width x vehicles) array, positions outside the window are NaN
+    """
+    width = int((end - start).max()) if len(start) else 1
+    positions = start[:, None] + np.arange(max(width, 1))
+    outside = positions >= end[:, None]
+    windows = values[np.minimum(positions, len(values) - 1)].astype(float)
+    windows[outside] = np.nan
+    return windows, outside
+
+
+class NumpyKernels:
+    """
+        Vectorized rolling kernels. Inputs are (samples x vehicles) arrays.
+    """
+
+    @staticmethod
+    def rolling_mean(values, start, end, min_periods):
+        windows, _ = _gather(values, start, end)
+        count = (~np.isnan(windows)).sum(axis=1)
+        total = np.nansum(windows, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        return np.where(count >= max(min_periods, 1), mean, np.nan)
+
+    @staticmethod
+    def rolling_std(values, start, end, min_periods):
+        windows, _ = _gather(values, start, end)
+        count = (~np.isnan(windows)).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(windows, axis=1) / count
+            variance = np.nansum((windows - mean[:, None, :]) ** 2, axis=1) / (count - 1)
+        return np.where((count >= max(min_periods, 1)) & (count > 1), np.sqrt(variance), np.nan)
+
+    @staticmethod
+    def rolling_percentile(values, start, end, min_periods, q=FACTOR_SPEED_CHG):
+        windows, outside = _gather(values, start, end)
+        count = (~np.isnan(windows)).sum(axis=1)
+        has_nan = (np.isnan(windows) & ~outside[:, :, None]).any(axis=1)
+
+        # NaN (padding) are sorted at the end of each window
+        ordered = np.sort(windows, axis=1)
+        length = end - start
+        position = (length - 1) * q / 100
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, length - 1)
+        shape = (len(ordered), 1, ordered.shape[2])
+        lower_value = np.take_along_axis(ordered, np.broadcast_to(lower[:, None, None], shape), axis=1)[:, 0, :]
+        upper_value = np.take_along_axis(ordered, np.broadcast_to(upper[:, None, None], shape), axis=1)[:, 0, :]
+        percentile = lower_value + (upper_value - lower_value) * (position - lower)[:, None]
+        return np.where(has_nan | (count < min_periods), np.nan, percentile)
+
+    @staticmethod
+    def rolling_any(mask, start, end, min_periods, valid=None):
+        """
+            ``valid`` (samples x vehicles) optionally marks the windows that are complete (see batch.py)
+        """
+        cumulative = np.concatenate([np.zeros((1, mask.shape[1])), np.cumsum(mask, axis=0)])
+        total = cumulative[end] - cumulative[start]
+        active = (total > 0) & ((end - start) >= min_periods)[:, None]
+        return active if valid is None else active & valid
+
+    @classmethod
+    def speed_statistics(cls, speeds, start, end, min_periods):
+        """
+            Moving average, moving std of the average, derivative of the std and derivative of the average
+        """
+        average = cls.rolling_mean(speeds, start, end, min_periods)
+        stdev = cls.rolling_std(average, start, end, min_periods)
+        derivative_sd = _diff(stdev)
+        return {
+            "average": average,
+            "stdev": stdev,
+            "derivative_sd": derivative_sd,
+            "abs_derivative_sd": np.abs(derivative_sd),
+            "derivative": np.abs(_diff(average)),
+        }
+
+    @classmethod
+    def changing_samples(cls, abs_derivative_sd, start, end, min_periods):
+        """
+            Samples whose forward percentile of Abs(Diff(std)) is above the std of the column
+        """
+        percentile = cls.rolling_percentile(abs_derivative_sd, start, end, min_periods)
+        with np.errstate(invalid="ignore"):
+            return percentile > np.nanstd(abs_derivative_sd, axis=0, ddof=1)
+
+    @classmethod
+    def transition_samples(cls, changing, derivative, start, end, min_periods, valid=None):
+        """
+            Rising edges of the forward window activity masked by the speed variation threshold
+        """
+        active = cls.rolling_any(changing, start, end, min_periods, valid)
+        rising = np.zeros_like(active)
+        rising[1:] = ~active[:-1] & active[1:]
+        with np.errstate(invalid="ignore"):
+            slow_rate = derivative < np.nanstd(derivative, axis=0, ddof=1)
+        return rising & slow_rate
+
+
+def _diff(values):
+    """
+        First order difference along the samples (first sample is NaN)
+    """
+    result = np.full(values.shape, np.nan)
+    result[1:] = values[1:] - values[:-1]
+    return result
+
+
+# ============================================================================
+# JIT KERNELS
+# ============================================================================
+
+
+def _rolling_mean_loop(values, start, end, min_periods):
+    result = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        for i in range(values.shape[0]):
+            total = 0.0
+            count = 0
+            for k in range(start[i], end[i]):
+                if not np.isnan(values[k, j]):
+                    total += values[k, j]
+                    count += 1
+            if count >= max(min_periods, 1):
+                result[i, j] = total / count
+    return result
+
+
+def _rolling_std_loop(values, start, end, min_periods):
+    result = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        for i in range(values.shape[0]):
+            total = 0.0
+            count = 0
+            for k in range(start[i], end[i]):
+                if not np.isnan(values[k, j]):
+                    total += values[k, j]
+                    count += 1
+            if count < max(min_periods, 1) or count < 2:
+                continue
+            mean = total / count
+            squares = 0.0
+            for k in range(start[i], end[i]):
+                if not np.isnan(values[k, j]):
+                    squares += (values[k, j] - mean) ** 2
+            result[i, j] = np.sqrt(squares / (count - 1))
+    return result
+
+
+def _rolling_percentile_loop(values, start, end, min_periods, q):
+    result = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        for i in range(values.shape[0]):
+            window = np.sort(values[start[i] : end[i], j])
+            length = window.shape[0]
+            if length < min_periods or np.isnan(window[length - 1]):
+                continue
+            position = (length - 1) * q / 100
+            lower = int(np.floor(position))
+            upper = min(lower + 1, length - 1)
+            result[i, j] = window[lower] + (window[upper] - window[lower]) * (position - lower)
+    return result
+
+
+if numba is not None:
+    _rolling_mean_loop = numba.njit(cache=True)(_rolling_mean_loop)
+    _rolling_std_loop = numba.njit(cache=True)(_rolling_std_loop)
+    _rolling_percentile_loop = numba.njit(cache=True)(_rolling_percentile_loop)
+
+
+class NumbaKernels(NumpyKernels):
+    """
+        JIT compiled rolling kernels (one pass per window, no intermediate stacked windows)
+    """
+
+    @staticmethod
+    def rolling_mean(values, start, end, min_periods):
+        return _rolling_mean_loop(np.ascontiguousarray(values, dtype=float), start, end, min_periods)
+
+    @staticmethod
+    def rolling_std(values, start, end, min_periods):
+        return _rolling_std_loop(np.ascontiguousarray(values, dtype=float), start, end, min_periods)
+
+    @staticmethod
+    def rolling_percentile(values, start, end, min_periods, q=FACTOR_SPEED_CHG):
+        return _rolling_percentile_loop(np.ascontiguousarray(values, dtype=float), start, end, min_periods, float(q))
+
+
+# ============================================================================
+# EQUIVALENCE
+# ============================================================================
+
+
+def check_equivalence(dataExp, engine: str, windowSize=10, windowForward=20, atol: float = 1e-7):
+    """
+        Run the ``pandas`` reference and ``engine`` on copies of a cleaned run and raise an ``AssertionError`` if the outputs diverge.
+
+        Statistics are compared within ``atol`` (the reference rolling std accumulates ~1e-8 of round-off), changing/detection masks and transition times must be identical. See validation.py for the full report.
+
+        Example:
+            Check all the backends on a bundled run ::
+
+                >>> from collector.handler import DataHandler
+                >>> x = DataHandler('data/raw/carma/data5.csv')
+                >>> x._standardize_data(); x._clean_data()
+                >>> for engine in ENGINES[1:]:
+                ...     check_equivalence(x.data, engine)
+    """
+    from .validation import compare_run, reference_implementation, engine_implementation
+
+    report = compare_run(
+        dataExp, reference_implementation(), engine_implementation(engine), windowSize, windowForward, atol=atol
+    )
+    if not report["passed"]:
+        raise AssertionError(f"{engine} diverges from the pandas reference: {report}")
@@ -0,0 +1,96 @@
+"""
+    This module provides the compact representation of the transition times detected within a platoon.
+
+    Events are stored as a struct of arrays (vehicle id, sample index, time) sorted by vehicle and time, with the offsets of the events of each vehicle. The detectors produce it directly from their detection masks, the reaction matching and the plots read the per vehicle slices without intermediate frames.
+
+    Example:
+        Transition times of the leader ::
+
+            >>> events = detect_transition_times(data)
+            >>> events.times(0)
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class TransitionEvents:
+    """
+        Transition events of a platoon sorted by (vehicle, time)
+
+        Args:
+            vehid(array): Vehicle id of each event (0 is the leader)
+            index(array): Position of the event sample within the data
+            time(array): Time of the event
+            offsets(array): Events of vehicle ``i`` are ``offsets[i]:offsets[i + 1]``
+    """
+
+    vehid: np.ndarray
+    index: np.ndarray
+    time: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def from_masks(cls, time, masks):
+        """
+            Events from the detection masks (samples x vehicles) of a run sorted by time
+        """
+        masks = np.asarray(masks, dtype=bool)
+        vehid, index = np.nonzero(masks.T)
+        offsets = np.searchsorted(vehid, np.arange(masks.shape[1] + 1))
+        return cls(vehid.astype(np.int64), index, np.asarray(time, dtype=float)[index], offsets)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __repr__(self):
+        counts = ", ".join(f"{vehid}: {n}" for vehid, n in enumerate(self.counts))
+        return f"{self.__class__.__name__}({{{counts}}})"
+
+    @property
+    def n_vehicles(self):
+        return len(self.offsets) - 1
+
+    @property
+    def counts(self):
+        """
+            Number of events per vehicle
+        """
+        return np.diff(self.offsets)
+
+    def times(self, vehid):
+        """
+            Times of the events of a vehicle (view)
+        """
+        return self.time[self.offsets[vehid] : self.offsets[vehid + 1]]
+
+    def indices(self, vehid):
+        """
+            Sample positions of the events of a vehicle (view)
+        """
+        return self.index[self.offsets[vehid] : self.offsets[vehid + 1]]
+
+    def mask(self, vehid, n_samples):
+        """
+            Detection mask of a vehicle over ``n_samples``
+        """
+        mask = np.zeros(n_samples, dtype=bool)
+        mask[self.indices(vehid)] = True
+        return mask
+
+    def to_frame(self):
+        """
+            Long format ``vehid``, ``value`` (one row per event)
+        """
+        return pd.DataFrame({"vehid": self.vehid, "value": self.time})
@@ -7,6 +7,7 @@
 # STANDARD  IMPORTS
 # ============================================================================
 
+import warnings
 from dataclasses import dataclass
 import pandas as pd
 import numpy as np
@@ -19,7 +20,9 @@ from itertools import repeat
 from .constants import (
     COLUMNS_SPEED_POC,
     STANDARD_SPEED_COLUMNS,
+    STANDARD_SPACING_COLUMNS,
     DCT_STD_SPEED_CSV,
+    DCT_STD_SPACING_CSV,
     # Standard functions for columns
     standard_speed,
     average_velocity,
@@ -29,7 +32,14 @@ from .constants import (
     derivative_velocity,
     changes,
     detection,
+    distance_predecessor,
+    distance_leader,
+    delta_velocity,
+    DEFAULT_EVENT_FEATURES,
 )
+from .engines import FACTOR_SPEED_CHG, resolve_engine, get_kernels, window_bounds
+from .changepoint import METHODS, detect_changepoints
+from .events import TransitionEvents
 
 
 COLUMNS_TIME = ["Time"]
@@ -39,11 +49,43 @@ COLUMNS_TIME = ["Time"]
 # ============================================================================
 
 
+class TimeForwardWindowIndexer(pd.api.indexers.BaseIndexer):
+    """
+        Forward window covering the samples within ``[t, t + window_time)`` 
+
+        Example:
+            A 2 seconds window ahead of each sample::
+
+                >>> indexer = TimeForwardWindowIndexer(index_array=data["Time"].to_numpy(), window_time=2.0)
+                >>> data["Speed - 0"].rolling(window=indexer).mean()
+    """
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        times = np.asarray(self.index_array, dtype=float)
+        start = np.arange(num_values, dtype=np.int64)
+        end = np.searchsorted(times, times + self.window_time, side="left").astype(np.int64)
+        return start, end
+
+
+def forward_indexer(dataExp, window):
+    """
+        Forward indexer (to account for k+h instead of classic k-h). 
+
+        Args: 
+            window(int, str): Number of samples (``20``) or time span (``"2s"``, ``pd.Timedelta``) of the window
+    """
+    if isinstance(window, (str, pd.Timedelta)):
+        return TimeForwardWindowIndexer(
+            index_array=dataExp["Time"].to_numpy(dtype=float), window_time=pd.Timedelta(window).total_seconds()
+        )
+    return pd.api.indexers.FixedForwardWindowIndexer(window_size=window)
+
+
 def standardize_dataframe(dataExp):
     """ 
         This just fixes the column names so that they are familiar for all 
     """
-    return dataExp.rename(columns=DCT_STD_SPEED_CSV)
+    return dataExp.rename(columns={**DCT_STD_SPEED_CSV, **DCT_STD_SPACING_CSV})
 
 
 def clean_data(dataExp):
@@ -68,7 +110,65 @@ def clean_data(dataExp):
     return dataFilter
 
 
-def compute_statistics(dataExp, windowSize: int = 10):
+def resample_data(dataExp, period: float = 0.1, max_gap: float = 1.0):
+    """
+        Resample the data onto a uniform time grid of step ``period``. 
+
+        All numeric and boolean columns (nullable ``Int64``/``boolean`` included) are linearly interpolated at once between the surrounding samples and returned as floats, other columns (text) are dropped with a warning. Grid points falling within a gap larger than ``max_gap`` seconds in the original data are masked with ``NaN``. 
+
+        Args: 
+            period(float): Time step of the grid (s)
+            max_gap(float): Largest gap in the original data that is interpolated (s)
+    """
+    dataSorted = dataExp.drop_duplicates(subset=COLUMNS_TIME, keep="last").sort_values(by=COLUMNS_TIME)
+    numeric = dataSorted.select_dtypes(["number", "bool", "boolean"]).columns
+    columns = [col for col in numeric if col not in COLUMNS_TIME]
+    dropped = [col for col in dataSorted.columns if col not in numeric]
+    if dropped:
+        warnings.warn(f"Non numeric columns are not resampled: {dropped}")
+    time = dataSorted["Time"].to_numpy(dtype=float)
+    values = dataSorted[columns].to_numpy(dtype=float, na_value=np.nan)
+
+    if len(time) < 2:
+        return dataSorted[COLUMNS_TIME + columns].reset_index(drop=True)
+
+    n_steps = int(np.floor((time[-1] - time[0]) / period + 1e-9)) + 1
+    grid = np.round(time[0] + period * np.arange(n_steps), 9)
+
+    # Surrounding samples for each grid point
+    right = np.searchsorted(time, grid, side="right").clip(1, len(time) - 1)
+    left = right - 1
+    span = time[right] - time[left]
+    weight = ((grid - time[left]) / span)[:, None]
+
+    resampled = values[left] + weight * (values[right] - values[left])
+    resampled = np.where(weight <= 0, values[left], np.where(weight >= 1, values[right], resampled))
+
+    # Gap masking (samples falling exactly on the grid are kept)
+    in_gap = (span > max_gap)[:, None] & (weight > 0) & (weight < 1)
+    resampled[np.broadcast_to(in_gap, resampled.shape)] = np.nan
+
+    dataResampled = pd.DataFrame(resampled, columns=columns)
+    dataResampled.insert(0, "Time", grid)
+    return dataResampled
+
+
+def time_slice(dataExp, start: float, stop: float, period: float = None):
+    """
+        Select the samples within ``[start, stop)``. 
+
+        On a uniform grid (``period`` provided, see ``resample_data``) row positions are computed directly from the times, otherwise they are found by binary search on ``Time``.
+    """
+    if period:
+        t0 = dataExp["Time"].iat[0]
+        first = max(int(np.ceil((start - t0) / period - 1e-9)), 0)
+        last = max(int(np.ceil((stop - t0) / period - 1e-9)), 0)
+    else:
+        first, last = np.searchsorted(dataExp["Time"].to_numpy(), (start, stop), side="left")
+    return dataExp.iloc[first:last]
+
+
+def compute_statistics(dataExp, windowSize: int = 10, engine: str = "pandas"):
     """ 
         Compute statistics from the speed variable. This script will compute statiscs for the speed variable for all the vehicles within the platoon. 
 
@@ -80,13 +180,25 @@ def compute_statistics(dataExp, windowSize: int = 10):
         * Derivative of speed (from Speed moving average)
 
         Args: 
-            windowSize(int): Size of the moving average window. Fixed to Forward index for prediction capabilities
+            windowSize(int, str): Size of the moving average window, in samples (``10``) or as a time span (``"1s"``). Fixed to Forward index for prediction capabilities
+            engine(str): Compute backend ``pandas`` (reference), ``numpy`` or ``numba`` (see engines.py)
     """
 
     standardize_dataframe(dataExp)
 
     # Forward indexer (to account for k+h instead of classic k-h)
-    indexer = pd.api.indexers.FixedForwardWindowIndexer(window_size=windowSize)
+    indexer = forward_indexer(dataExp, windowSize)
+
+    if resolve_engine(engine) != "pandas":
+        speeds = dataExp[STANDARD_SPEED_COLUMNS].to_numpy(dtype=float)
+        stats = get_kernels(engine).speed_statistics(speeds, *window_bounds(indexer, len(dataExp)))
+        for vehid in range(5):
+            dataExp[average_velocity(vehid)] = stats["average"][:, vehid]
+            dataExp[stdev_velocity(vehid)] = stats["stdev"][:, vehid]
+            dataExp[derivative_sd_velocity(vehid)] = stats["derivative_sd"][:, vehid]
+            dataExp[abs_derivative_sd_velocity(vehid)] = stats["abs_derivative_sd"][:, vehid]
+            dataExp[derivative_velocity(vehid)] = stats["derivative"][:, vehid]
+        return dataExp
 
     for vehid, col in enumerate(STANDARD_SPEED_COLUMNS):
         # Find moving average speed
@@ -106,13 +218,126 @@ def compute_statistics(dataExp, windowSize: int = 10):
     return dataExp
 
 
-def detect_changing_times(dataExp, indexerFuture):
+def compute_spacing(dataExp):
+    """
+        Compute the spacing between the vehicles within the platoon. The radar of follower ``i`` measures the gap towards vehicle ``i-1``, therefore the distance to the leader is the cumulative sum of the radar readings along the platoon.
+
+        The function computes:
+
+        * Distance to predecessor (radar reading of the follower)
+        * Distance to leader (cumulative sum of the radar readings)
+        * Speed delta w.r.t predecessor (closing rate of the spacing)
+    """
+    radar = dataExp[STANDARD_SPACING_COLUMNS].to_numpy(dtype=float)
+    cumulative = np.cumsum(radar, axis=1)
+    speed = dataExp[STANDARD_SPEED_COLUMNS].to_numpy(dtype=float)
+
+    for vehid in range(1, 5):
+        dataExp[distance_predecessor(vehid)] = radar[:, vehid - 1]
+        dataExp[distance_leader(vehid)] = cumulative[:, vehid - 1]
+        dataExp[delta_velocity(vehid)] = speed[:, vehid - 1] - speed[:, vehid]
+
+    return dataExp
+
+
+def extract_event_features(
+    dataExp, reaction_instants, features=None, offsets=(0,), direction="backward", tolerance=None
+):
+    """
+        Extract features of the vehicles at their reaction instants and at time offsets around them. 
+
+        All the query times ``t_i + offset`` are sorted once and matched against ``Time`` with a single as-of join (``pd.merge_asof``) instead of filtering the data for each event.
+
+        Args: 
+            reaction_instants(list): Chains of reaction times ``[t_0, t_1, ..., t_4]`` (see ``DataHandler._compute_reaction_timeinstants``)
+            features(dict): ``{name: column}`` where column is a column name or a function of the vehicle id (``DEFAULT_EVENT_FEATURES`` by default)
+            offsets(tuple): Time offsets (in seconds) w.r.t the reaction instant
+            direction(str): Matching direction of the as-of join (``backward``, ``forward``, ``nearest``)
+            tolerance(float): Maximum distance between the query time and the matched sample
+
+        Returns:
+            DataFrame with one row per (chain, vehicle, offset). Features not defined for a vehicle (e.g. spacing of the leader) are ``NaN``
+    """
+    features = DEFAULT_EVENT_FEATURES if features is None else features
+    instants = np.asarray(reaction_instants, dtype=float).reshape(-1, 5)
+    offsets = np.asarray(offsets, dtype=float)
+
+    # Long table of events: chain x vehicle x offset
+    chain, vehid, offset = np.meshgrid(
+        np.arange(1, len(instants) + 1), np.arange(5), offsets, indexing="ij"
+    )
+    events = pd.DataFrame(
+        {
+            "chgt": chain.ravel(),
+            "vehid": vehid.ravel(),
+            "offset": offset.ravel(),
+            "Event time": np.repeat(instants.ravel(), len(offsets)),
+        }
+    )
+    events["Time"] = events["Event time"] + events["offset"]
+
+    # Resolve columns per vehicle
+    resolved = {
+        name: [col(veh) if callable(col) else col for veh in range(5)] for name, col in features.items()
+    }
+    columns = sorted({c for cols in resolved.values() for c in cols if c in dataExp.columns})
+
+    samples = dataExp[COLUMNS_TIME + columns].sort_values("Time")
+    samples["Sample time"] = samples["Time"]
+    matched = pd.merge_asof(
+        events.sort_values("Time"), samples, on="Time", direction=direction, tolerance=tolerance
+    )
+
+    # Pick for every row the column that belongs to its vehicle
+    result = matched[["chgt", "vehid", "offset", "Event time", "Time", "Sample time"]].copy()
+    for name, cols in resolved.items():
+        values = np.full(len(matched), np.nan)
+        for veh, col in enumerate(cols):
+            mask = (matched["vehid"] == veh).to_numpy()
+            if col in matched.columns:
+                values[mask] = matched.loc[mask, col]
+        result[name] = values
+
+    return result.sort_values(["chgt", "vehid", "offset"]).reset_index(drop=True)
+
+
+def compute_position_gaps(dataExp, reaction_instants, reference="leader"):
+    """
+        Computes the position gap of each follower at its reaction instant. 
+
+        The output has one row per follower and one column ``chgt{j}`` per reaction chain, (same layout as ``df_ecart_position_*``)
+
+        Args: 
+            reaction_instants(list): Chains of reaction times ``[t_0, t_1, ..., t_4]`` (see ``DataHandler._compute_reaction_timeinstants``)
+            reference(str): ``leader`` for the distance to the head of the platoon, ``predecessor`` for the distance to vehicle ``i-1``
+    """
+    if reference == "leader":
+        feature = {"gap": distance_leader}
+    elif reference == "predecessor":
+        feature = {"gap": distance_predecessor}
+    else:
+        raise ValueError(f"Unknown reference '{reference}', use 'leader' or 'predecessor'")
+
+    gaps = extract_event_features(dataExp, reaction_instants, feature)
+    gaps = gaps[gaps["vehid"] > 0].pivot(index="vehid", columns="chgt", values="gap")
+    gaps = gaps.reindex(index=range(1, 5), columns=range(1, len(reaction_instants) + 1))
+    gaps.index.name = "follower"
+    gaps.columns = [f"chgt{j}" for j in gaps.columns]
+    return gaps
+
+
+def detect_changing_times(dataExp, indexerFuture, engine: str = "pandas"):
     """
         Based on statistics this computes the transition times of the vehicles within the platoon:
 
         The function add the column `change_i` to denote the samples detected as changing samples.
     """
-    FACTOR_SPEED_CHG = 95
+    if resolve_engine(engine) != "pandas":
+        values = dataExp[[abs_derivative_sd_velocity(vehid) for vehid in range(5)]].to_numpy(dtype=float)
+        changing = get_kernels(engine).changing_samples(values, *window_bounds(indexerFuture, len(dataExp)))
+        for vehid in range(5):
+            dataExp[changes(vehid)] = changing[:, vehid]
+        return
 
     # For each veh in platoon
     for vehid in range(5):
@@ -130,14 +355,28 @@ def detect_changing_times(dataExp, indexerFuture):
         dataExp[changes(vehid)].fillna(False, inplace=True)
 
 
-def detect_transition_times(dataExp, windowForward=20):
+def detect_transition_times(dataExp, windowForward=20, engine: str = "pandas", method: str = "window", **kwargs):
     """
         Based on the detection of changing times it computes the samples that trigger the time samples
+
+        Returns the transition events of the platoon (see events.py)
+
+        Args: 
+            windowForward(int, str): Size of the forward window, in samples (``20``) or as a time span (``"2s"``)
+            engine(str): Compute backend ``pandas`` (reference), ``numpy`` or ``numba`` (see engines.py)
+            method(str): ``window`` (rolling statistics) or ``cusum`` (change-point detector on the speed, see changepoint.py). ``kwargs`` are passed to the change-point detector (``TypeError`` with the window method)
     """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', use one of {METHODS}")
+    if method == "cusum":
+        return detect_changepoints(dataExp, **kwargs)
+    if kwargs:
+        raise TypeError(f"Unexpected arguments for the window method: {sorted(kwargs)}")
+
     # Forward indexer (to account for k+h instead of classic k-h)
-    indexerFuture = pd.api.indexers.FixedForwardWindowIndexer(window_size=windowForward)
+    indexerFuture = forward_indexer(dataExp, windowForward)
 
-    detect_changing_times(dataExp, indexerFuture)
+    detect_changing_times(dataExp, indexerFuture, engine)
 
     cols_changes = [changes(veh) for veh in range(5)]
     columns = COLUMNS_TIME + cols_changes
@@ -147,8 +386,18 @@ def detect_transition_times(dataExp, windowForward=20):
     # dataDetections["Detection time"] = dataDetections["Time"]
     # dataDetections.set_index("Time", inplace=True)
 
+    if resolve_engine(engine) != "pandas":
+        changing = dataDetections[cols_changes].to_numpy(dtype=bool)
+        derivative = dataExp[[derivative_velocity(vehid) for vehid in range(5)]].to_numpy(dtype=float)
+        final_masks = get_kernels(engine).transition_samples(
+            changing, derivative, *window_bounds(indexerFuture, len(dataExp))
+        )
+        for vehid in range(5):
+            dataExp[detection(vehid)] = final_masks[:, vehid]
+        return TransitionEvents.from_masks(dataDetections["Time"].to_numpy(), final_masks)
+
     # For each veh in platoon
-    platoonDetections = []
+    final_masks = np.zeros((len(dataExp), 5), dtype=bool)
     for vehid in range(5):
 
         total = dataDetections[changes(vehid)].rolling(window=indexerFuture).sum()
@@ -160,14 +409,11 @@ def detect_transition_times(dataExp, windowForward=20):
         # Find speed variations greater than a threshold
         mask_positive_speed_rate = dataExp[derivative_velocity(vehid)] < dataExp[derivative_velocity(vehid)].std()
         final_mask = (int_detection * mask_positive_speed_rate).astype(bool)
-
-        # Append dictionary {vehid: time} -> [:-1] to eliminate the last one which is regularly not due to real transition but due to switches betwen
-        timesvehid = [{vehid: det_time} for det_time in dataDetections[final_mask]["Time"]]
-        platoonDetections += timesvehid
+        final_masks[:, vehid] = final_mask.to_numpy()
 
         dataExp[detection(vehid)] = final_mask
 
-    return pd.DataFrame(platoonDetections)
+    return TransitionEvents.from_masks(dataDetections["Time"].to_numpy(), final_masks)
 
 
 def consecutive_times(test_list, *args):
@@ -204,3 +450,65 @@ def consecutive_times(test_list, *args):
         next_t = []
 
     return values2compare[:1] + next_t
+
+
+def compute_reaction_instants(events, matcher=None):
+    """
+        Retrieve reaction instants from the transition events (see ``detect_transition_times``)
+
+        The function constructs a list of lists, the inner lists contains transition times for all vehicles in the platoon
+
+        Args: 
+            matcher(function): Chain matching function with the signature of ``consecutive_times`` (default)
+    """
+    matcher = consecutive_times if matcher is None else matcher
+
+    # Vehicles without events are left out (no chain can then reach the tail)
+    lst_test = [events.times(vehid) for vehid in range(events.n_vehicles) if events.counts[vehid]]
+
+    if not lst_test:
+        return []
+
+    reaction_instants = []
+    leader_times = lst_test[0]
+    for head_time in leader_times:
+        reaction_instants.append(matcher(lst_test, head_time))
+
+    return [ri for ri in reaction_instants if len(ri) == 5]
+
+
+def compute_leader_follower_times(reaction_instants):
+    """
+        Compute the response time leader - follower
+    """
+    response_times = []
+    for ri in reaction_instants:
+        response_times += [{i: y - x} for i, x, y in zip(range(1, 5), ri[:-1], ri[1:])]
+    return pd.DataFrame(response_times)
+
+
+def compute_head_follower_times(reaction_instants):
+    """
+        Compute the response time head - follower
+    """
+    lead_times = []
+    for ri in reaction_instants:
+        lead_times += [{i: x - ri[0]} for i, x in zip(range(1, 5), ri[1:])]
+    return pd.DataFrame(lead_times)
+
+
+def response_time_table(reaction_instants, reference="leader"):
+    """
+        Response times of a run in long format ``Platoon ID``, ``Response time``
+
+        Args:
+            reaction_instants(list): Chains of reaction times (see ``compute_reaction_instants``)
+            reference(str): ``leader`` for response times (i-1, i), ``head`` for response times (0, i)
+    """
+    if reference == "leader":
+        rtdf = compute_leader_follower_times(reaction_instants)
+    elif reference == "head":
+        rtdf = compute_head_follower_times(reaction_instants)
+    else:
+        raise ValueError(f"Unknown reference '{reference}', use 'leader' or 'head'")
+    return pd.melt(rtdf, var_name="Platoon ID", value_name="Response time").dropna()
@@ -12,7 +12,6 @@
 # STANDARD  IMPORTS
 # ============================================================================
 
-import pandas as pd
 from matplotlib import pyplot as plt
 
 # ============================================================================
@@ -22,15 +21,22 @@ from matplotlib import pyplot as plt
 from .carma import CarmaData
 from .poc import POCData
 from .constants import COLUMNS_TIME
+from .schema import experiment_mode
 from .generic import (
     clean_data,
     standardize_dataframe,
+    resample_data,
+    time_slice,
     compute_statistics,
+    compute_spacing,
+    compute_position_gaps,
+    extract_event_features,
     detect_transition_times,
-    consecutive_times,
+    compute_reaction_instants,
+    compute_leader_follower_times,
+    compute_head_follower_times,
     average_velocity,
     changes,
-    detection,
 )
 
 # ============================================================================
@@ -39,40 +45,63 @@ from .generic import (
 
 
 class DataHandler:
-    def __init__(self, csvpath=""):
+    def __init__(self, csvpath="", features=None):
 
-        if "carma" in csvpath:
+        if experiment_mode(csvpath) == "carma":
             self.datahandler = CarmaData(csvpath)
         else:
             self.datahandler = POCData(csvpath)
-        self.datahandler._load_data_from_csv()
+        self.datahandler._load_data_from_csv(features=features)
         self.data = self.datahandler._csvdata
         self._csvpath = self.datahandler._csvpath
+        self._period = None
+        self._cleaned = False
 
     def __repr__(self):
         return repr(self.data)
 
-    def compute_response_times(self, **kwargs):
+    def compute_response_times(
+        self, resample=None, windowForward=20, engine="pandas", method="window", detector_kwargs=None, **kwargs
+    ):
         """
         Performs computation of the response times for a specific dataset, the
         full pipeline includes
 
         * loading data
         * cleaning data
+        * resampling data (optional, when ``resample`` is the grid period in s)
+        * computing spacing
         * computing statistics
         * computing transition times
             * (leader / follower)
             * (head / follower)
 
+        ``engine`` selects the compute backend of the statistics and
+        detection stages (``pandas``, ``numpy`` or ``numba``), ``method`` the
+        transition detector (``window`` or ``cusum``). ``detector_kwargs``
+        are passed to the transition detector (e.g. ``drift``, ``threshold``,
+        ``hold`` of the CUSUM detector), ``kwargs`` to the statistics.
+
+        Statistics are computed with both detectors: the CUSUM detector does
+        not use them but the plots use the moving average speeds
+
+        Standardization and cleaning are skipped when the data has already
+        been cleaned (e.g. by ``PrefetchLoader``)
         """
-        print("Standarizing data")
-        self._standardize_data()
-        print("Cleaning data")
-        self._clean_data()
+        if not self._cleaned:
+            print("Standarizing data")
+            self._standardize_data()
+            print("Cleaning data")
+            self._clean_data()
+        if resample:
+            print("Resampling data")
+            self._resample_data(resample)
+        print("Computing spacing")
+        self._compute_spacing()
         print("Computing Statistics")
-        self._compute_speed_statistics(**kwargs)
+        self._compute_speed_statistics(engine=engine, **kwargs)
         print("Computing transition times")
-        self._compute_transition_times()
+        self._compute_transition_times(windowForward, engine, method, **(detector_kwargs or {}))
         # print("Computing response time i/ i-1")
         # self._compute_leader_follower_times()
         # print("Computing response time 1/i")
@@ -93,6 +122,33 @@ class DataHandler:
          Check more info within the generic.py module
         """
         self.data = clean_data(self.data)
+        self._cleaned = True
+
+    def _resample_data(self, period=0.1, **kwargs):
+        """
+        Resample data onto a uniform time grid
+
+        Check more info within the generic.py module
+        """
+        self.data = resample_data(self.data, period, **kwargs)
+        self._period = period
+
+    def time_slice(self, start, stop):
+        """
+        Select data within ``[start, stop)``, direct positional access when
+        the data has been resampled
+
+        Check more info within the generic.py module
+        """
+        return time_slice(self.data, start, stop, self._period)
+
+    def _compute_spacing(self):
+        """
+        Compute distance to predecessor and distance to leader
+
+        Check more info within the generic.py module
+        """
+        compute_spacing(self.data)
 
     def _compute_speed_statistics(self,**kwargs):
         """
@@ -102,15 +158,15 @@ class DataHandler:
         """
         compute_statistics(self.data,**kwargs)
 
-    def _compute_transition_times(self):
+    def _compute_transition_times(self, windowForward=20, engine="pandas", method="window", **kwargs):
         """
-        Compute transition times from the
+        Compute transition times from the statistics, stored as transition
+        events (see events.py)
+
+        Check more info within the generic.py module
         """
         print(f"Treating case: {self.datahandler._experiment}")
-        self._transitiontimes = detect_transition_times(self.data)
-        self._transitiontimes = pd.melt(
-            self._transitiontimes, var_name="vehid"
-        ).dropna()
+        self._transitiontimes = detect_transition_times(self.data, windowForward, engine, method, **kwargs)
 
     def _compute_reaction_timeinstants(self):
         """
@@ -118,39 +174,48 @@ class DataHandler:
 
         The function constructs a list of lists, the inner lists contains transition times for all vehicles in the platoon
         """
-        lst_test = []
-
-        for _, v in self._transitiontimes.groupby("vehid"):
-            lst_test.append(list(v.value.values))
-
-        reaction_instants = []
-        leader_times = lst_test[0]
-        for head_time in leader_times:
-            reaction_instants.append(consecutive_times(lst_test, head_time))
-
-        return [ri for ri in reaction_instants if len(ri) == 5]
+        return compute_reaction_instants(self._transitiontimes)
 
     def _compute_leader_follower_times(self):
         """
         Compute the response time leader - follower
         """
         reaction_instants = self._compute_reaction_timeinstants()
-        response_times = []
-        for ri in reaction_instants:
-            response_times += [
-                {i: y - x} for i, x, y in zip(range(1, 5), ri[:-1], ri[1:])
-            ]
-        return pd.DataFrame(response_times)
+        return compute_leader_follower_times(reaction_instants)
 
     def _compute_head_follower_times(self):
         """
         Compute the response time head - follower
         """
         reaction_instants = self._compute_reaction_timeinstants()
-        lead_times = []
-        for ri in reaction_instants:
-            lead_times += [{i: x - ri[0]} for i, x in zip(range(1, 5), ri[1:])]
-        return pd.DataFrame(lead_times)
+        return compute_head_follower_times(reaction_instants)
+
+    def _compute_position_gaps(self, reference="leader"):
+        """
+        Compute the position gap of each follower at its reaction instant
+
+        Args:
+            reference(str): ``leader`` or ``predecessor``
+        """
+        reaction_instants = self._compute_reaction_timeinstants()
+        return compute_position_gaps(self.data, reaction_instants, reference)
+
+    def compute_event_features(self, features=None, offsets=(0,), **kwargs):
+        """
+        Extract features (leader speed, spacing, speed deltas, ...) at every
+        reaction instant and at time offsets around it
+
+        Example:
+            Leader speed and spacing 1s before, at and 1s after the reaction::
+
+                >>> x = DataHandler('data/raw/carma/data5.csv')
+                >>> x.compute_response_times()
+                >>> x.compute_event_features(offsets=(-1, 0, 1))
+
+        Check more info within the generic.py module
+        """
+        reaction_instants = self._compute_reaction_timeinstants()
+        return extract_event_features(self.data, reaction_instants, features, offsets, **kwargs)
 
     # ============================================================================
     # Generic content probably for a general class to create heritage
@@ -195,7 +260,7 @@ class DataHandler:
             self.plot_curves(
                 self.data, col2plot, ax=ax, c="lightsteelblue", **kwargs
             )
-            fltdata = self.data[self.data[detection(vehid)]]
+            fltdata = self.data.iloc[self._transitiontimes.indices(vehid)]
             self.plot_curves(
                 fltdata, col2plot, ax=ax, kind="scatter", c="r", **kwargs
             )
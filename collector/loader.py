@@ -0,0 +1,134 @@
+"""
+    This module provides a pipelined loader for analyses over many runs.
+
+    Upcoming runs are parsed, standardized and cleaned on background threads while the current run is being processed. Runs are yielded in the input order.
+
+    Example:
+        To process the PoC runs while the next ones are loading ::
+
+            >>> from glob import glob
+            >>> from collector.loader import PrefetchLoader
+            >>> loader = PrefetchLoader(glob('data/raw/poc/*/*.csv'), prefetch=2)
+            >>> for experiment in loader:
+            ...     experiment.compute_response_times(windowSize=20)
+            >>> loader.timings
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from .handler import DataHandler
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+
+def _load_run(csvpath):
+    """
+        Parse, standardize and clean a run
+    """
+    experiment = DataHandler(csvpath)
+    experiment._standardize_data()
+    experiment._clean_data()
+    return experiment
+
+
+def _memory(experiment):
+    """
+        Memory held by the data of a loaded run (bytes)
+    """
+    return int(experiment.data.memory_usage(deep=True).sum())
+
+
+class PrefetchLoader:
+    """
+        Iterator over runs with background prefetching.
+
+        Args:
+            csvpaths(list): Paths to the runs
+            prefetch(int): Maximum number of runs loaded ahead of the current one
+            workers(int): Number of loading threads
+            max_bytes(int): Cap on the memory of the runs held: the run being processed and the runs loaded ahead. The memory of a pending run is estimated from its size on disk and the memory to disk ratio of the runs already loaded. At least one run is always loaded ahead
+    """
+
+    def __init__(self, csvpaths, prefetch: int = 2, workers: int = 2, max_bytes: int = None):
+        self._csvpaths = list(csvpaths)
+        self.prefetch = max(prefetch, 1)
+        self.workers = max(workers, 1)
+        self.max_bytes = max_bytes
+        self.timings = {"runs": 0, "wait (s)": 0.0, "compute (s)": 0.0}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self._csvpaths)} runs, prefetch={self.prefetch})"
+
+    def __len__(self):
+        return len(self._csvpaths)
+
+    def __iter__(self):
+        self.timings = {"runs": 0, "wait (s)": 0.0, "compute (s)": 0.0}
+        pending = deque(self._csvpaths)
+        in_flight = deque()
+        # Memory of the run being processed, memory and disk sizes of the runs loaded so far
+        usage = {"current": 0, "memory": 0, "disk": 0}
+
+        def estimate(csvpath):
+            ratio = usage["memory"] / usage["disk"] if usage["disk"] else 1.0
+            return os.path.getsize(csvpath) * ratio
+
+        def held():
+            total = usage["current"]
+            for future, csvpath in in_flight:
+                done = future.done() and not future.cancelled() and future.exception() is None
+                total += _memory(future.result()) if done else estimate(csvpath)
+            return total
+
+        def can_submit():
+            if not pending or len(in_flight) >= self.prefetch:
+                return False
+            if self.max_bytes is None or not in_flight:
+                return True
+            return held() + estimate(pending[0]) <= self.max_bytes
+
+        def fill():
+            while can_submit():
+                csvpath = pending.popleft()
+                in_flight.append((executor.submit(_load_run, csvpath), csvpath))
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while pending or in_flight:
+                fill()
+                future, csvpath = in_flight[0]
+                start = time.perf_counter()
+                experiment = future.result()
+                self.timings["wait (s)"] += time.perf_counter() - start
+                in_flight.popleft()
+
+                usage["current"] = _memory(experiment)
+                usage["memory"] += usage["current"]
+                usage["disk"] += os.path.getsize(csvpath)
+
+                # Refill before handing over the run
+                fill()
+
+                start = time.perf_counter()
+                yield experiment
+                self.timings["compute (s)"] += time.perf_counter() - start
+                usage["current"] = 0
+                self.timings["runs"] += 1
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
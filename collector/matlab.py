@@ -9,6 +9,12 @@
             >>> x.vehicle_names
             >>> x.transform_data_vehicle('Prius1') 
 
+    MATLAB v7.3 files (HDF5) are read lazily through ``h5py``: only the topics accessed are loaded, within the time range given to ``transform_data_vehicle`` ::
+
+            >>> x = GetData('data/raw/mat/session_8_2019-06-12.mat')
+            >>> x.transform_data_vehicle('Prius1', start=120, stop=180)
+            >>> x.vehicle_odom
+
 """
 
 # ============================================================================
@@ -16,17 +22,141 @@
 # ============================================================================
 
 import scipy.io
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from dataclasses import dataclass, InitVar
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
 
 # ============================================================================
 # CLASS AND DEFINITIONS
 # ============================================================================
 
 
+MAT73_HEADER = b"MATLAB 7.3"
+TIME_FIELD = "time"
+
+
+def is_matlab_v73(matlab_path):
+    """
+        True if the file is a MATLAB v7.3 (HDF5) file
+    """
+    with open(matlab_path, "rb") as f:
+        return f.read(len(MAT73_HEADER)) == MAT73_HEADER
+
+
+class HDF5Logset:
+    """
+        Lazy reader of the ``Logset`` structure of a MATLAB v7.3 file. Datasets are read only when a topic is requested, and only within the requested time range.
+
+        Example:
+            Odometry of a vehicle between 120 and 180 s ::
+
+                >>> log = HDF5Logset('data/raw/mat/session_8_2019-06-12.mat')
+                >>> log.read_topic('Prius1', 'vehicle_odom', start=120, stop=180)
+    """
+
+    def __init__(self, matlab_path, root="Logset"):
+        if h5py is None:
+            raise ImportError("Reading MATLAB v7.3 files requires h5py")
+        self._file = h5py.File(matlab_path, "r")
+        self._root = self._file[root]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._file.filename})"
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def closed(self):
+        return not self._file.id.valid
+
+    def _resolve(self, node):
+        """
+            Follow object references (MATLAB stores nested struct arrays as references)
+        """
+        while isinstance(node, h5py.Dataset) and node.dtype == h5py.ref_dtype:
+            node = self._file[node[()].flat[0]]
+        return node
+
+    def _group(self, *names):
+        node = self._root
+        for name in names:
+            node = self._resolve(node[name])
+        return node
+
+    @property
+    def vehicle_names(self):
+        return tuple(self._root.keys())
+
+    def topics(self, vehicle):
+        return tuple(self._group(vehicle).keys())
+
+    def _time_bounds(self, topic, start, stop):
+        """
+            Sample range of the topic within ``[start, stop)``, only the time vector is read
+        """
+        if TIME_FIELD not in topic or (start is None and stop is None):
+            return slice(None)
+        time = self._resolve(topic[TIME_FIELD])[()].ravel()
+        lo = 0 if start is None else np.searchsorted(time, start, side="left")
+        hi = len(time) if stop is None else np.searchsorted(time, stop, side="left")
+        return slice(int(lo), int(hi))
+
+    def _n_samples(self, topic, datasets):
+        """
+            Number of samples of the topic: length of its ``time`` vector, or of its longest vector
+        """
+        if TIME_FIELD in datasets:
+            return datasets[TIME_FIELD].size
+        return max((dataset.size for dataset in datasets.values()), default=0)
+
+    def read_topic(self, vehicle, topic, start=None, stop=None, fields=None):
+        """
+            DataFrame of a topic of a vehicle.
+
+            Vectors with one value per sample are sliced to the time range, scalars and ``char`` fields (decoded) are broadcast as in ``scipy.io.loadmat`` files, other fields (matrices, vectors of other length) are skipped.
+
+            Args:
+                start(float): Lower bound of the time range (``time`` field of the topic, topics without it are read whole)
+                stop(float): Upper bound (excluded) of the time range
+                fields(list): Fields to read (all by default)
+        """
+        group = self._group(vehicle, topic)
+        datasets = {}
+        for field in fields or group.keys():
+            dataset = self._resolve(group[field])
+            if isinstance(dataset, h5py.Dataset):
+                datasets[field] = dataset
+
+        n_samples = self._n_samples(group, datasets)
+        rows = self._time_bounds(group, start, stop)
+        n_rows = len(range(n_samples)[rows])
+
+        data = {}
+        for field, dataset in datasets.items():
+            matlab_class = dataset.attrs.get("MATLAB_class", b"")
+            matlab_class = matlab_class.decode() if isinstance(matlab_class, bytes) else str(matlab_class)
+            if matlab_class == "char":
+                data[field] = "".join(map(chr, dataset[()].ravel()))
+            elif dataset.dtype.kind not in "biuf":
+                continue
+            elif dataset.size == 1:
+                data[field] = dataset[()].ravel()[0]
+            elif dataset.size == n_samples and max(dataset.shape) == n_samples:
+                index = [slice(None)] * dataset.ndim
+                index[int(np.argmax(dataset.shape))] = rows
+                data[field] = dataset[tuple(index)].ravel()
+        return pd.DataFrame(data, index=range(n_rows))
+
+
 class PlotClass:
     def plot(self, vary, **kwargs):
         f, a = plt.subplots(figsize=(7, 7))
@@ -64,9 +194,28 @@ class GetData(PlotClass):
 
     def __init__(self, matlab_path):
         self._mathpath = matlab_path
-        self._matfile = scipy.io.loadmat(matlab_path)["Logset"]
+        self._dict_data = {}
+        if is_matlab_v73(matlab_path):
+            self._matfile = None
+            self._h5 = HDF5Logset(matlab_path)
+        else:
+            self._matfile = scipy.io.loadmat(matlab_path)["Logset"]
+            self._h5 = None
+
+    def __enter__(self):
+        return self
 
-    def transform_data_vehicle(self, vehicle: str = "Prius1"):
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+            Close the HDF5 file of MATLAB v7.3 files (topics already read remain available)
+        """
+        if self._h5 is not None:
+            self._h5.close()
+
+    def transform_data_vehicle(self, vehicle: str = "Prius1", start: float = None, stop: float = None):
         """
             Transform data into a dictionary of values accessible 
             for future operations
@@ -87,14 +236,26 @@ class GetData(PlotClass):
              'APU')
             
             Look at the log_set_description_file for more details
+
+            ``start`` and ``stop`` restrict the data to a time range. For
+            MATLAB v7.3 files the topics are read on first access, and only
+            within this range
         """
+        self.convert_times = False
+
+        if self._h5 is not None:
+            self._vehicle, self._time_range = vehicle, (start, stop)
+            self.datakeys = self._h5.topics(vehicle)
+            self._dict_data = {}
+            self._format_data()
+            return
 
         # Retrieve vehicle data
         vehicle_data = self._matfile[vehicle][0][0]
         self.datakeys = vehicle_data.dtype.names
         self._dict_data = {}
         for key in self.datakeys:
-            self._dict_data[key] = self._get_dataframe(vehicle_data[0][0][key])
+            self._dict_data[key] = self._time_slice(self._get_dataframe(vehicle_data[0][0][key]), start, stop)
         self._format_data()
 
     def _get_dataframe(self, array):
@@ -108,6 +269,28 @@ class GetData(PlotClass):
 
         return pd.DataFrame(arraydata)
 
+    @staticmethod
+    def _time_slice(dfTopic, start=None, stop=None):
+        """
+            Rows of a topic within ``[start, stop)``
+        """
+        if TIME_FIELD not in dfTopic or (start is None and stop is None):
+            return dfTopic
+        time = dfTopic[TIME_FIELD]
+        mask = (time >= (-np.inf if start is None else start)) & (time < (np.inf if stop is None else stop))
+        return dfTopic[mask].reset_index(drop=True)
+
+    def _topic(self, key):
+        """
+            Data of a topic, read on first access for MATLAB v7.3 files
+        """
+        if key not in self._dict_data and self._h5 is not None:
+            if self._h5.closed:
+                raise ValueError(f"Topic {key} was not read before closing {self._mathpath}")
+            start, stop = self._time_range
+            self._dict_data[key] = self._h5.read_topic(self._vehicle, key, start, stop)
+        return self._dict_data[key]
+
     def _format_data(self):
         """ 
             Data to format time stamps
@@ -125,6 +308,8 @@ class GetData(PlotClass):
                 .apply(tc)
                 # + getattr(self, "APU").timestamp.values[0]
             )
+            if self.APU.empty:
+                raise ValueError("No APU sample within the requested time range")
             basedate = datetime.fromtimestamp(self.APU.timestamp.values[0])
             newdate = basedate + deltaT
 
@@ -141,48 +326,50 @@ class GetData(PlotClass):
         """
             Return vehicle name data
         """
+        if self._h5 is not None:
+            return self._h5.vehicle_names
         return self._matfile.dtype.names
 
     @property
     def Ublox_GPS_driver_fix(self):
-        return self._dict_data["Ublox_GPS_driver_fix"]
+        return self._topic("Ublox_GPS_driver_fix")
 
     @property
     def Ublox_GPS_driver_fix_velocity(self):
-        return self._dict_data["Ublox_GPS_driver_fix"]
+        return self._topic("Ublox_GPS_driver_fix")
 
     @property
     def base_link_accel(self):
-        return self._dict_data["base_link_accel"]
+        return self._topic("base_link_accel")
 
     @property
     def vehicle_gear(self):
-        return self._dict_data["vehicle_gear"]
+        return self._topic("vehicle_gear")
 
     @property
     def vehicle_odom(self):
-        return self._dict_data["vehicle_odom"]
+        return self._topic("vehicle_odom")
 
     @property
     def vehicle_pedals(self):
-        return self._dict_data["vehicle_pedals"]
+        return self._topic("vehicle_pedals")
 
     @property
     def vehicle_steering_wheel(self):
-        return self._dict_data["vehicle_steering_wheel"]
+        return self._topic("vehicle_steering_wheel")
 
     @property
     def world_model_front_target(self):
-        return self._dict_data["world_model_front_target"]
+        return self._topic("world_model_front_target")
 
     @property
     def vehicle_hmi(self):
-        return self._dict_data["vehicle_hmi"]
+        return self._topic("vehicle_hmi")
 
     @property
     def vehicle_ControllerState(self):
-        return self._dict_data["vehicle_ControllerState"]
+        return self._topic("vehicle_ControllerState")
 
     @property
     def APU(self):
-        return self._dict_data["APU"]
+        return self._topic("APU")
@@ -0,0 +1,149 @@
+"""
+    This module provides parallel parameter sweeps over runs held in shared memory.
+
+    The standardized, cleaned time/speed/spacing arrays of each run are copied once into a ``multiprocessing.shared_memory`` block. Workers receive only the block name and attach to it without copying, then send back the (small) response time tables.
+
+    Example:
+        Calibrate the window sizes on a run ::
+
+            >>> from collector.handler import DataHandler
+            >>> from collector.parallel import parallel_sweep
+            >>> x = DataHandler('data/raw/carma/data5.csv')
+            >>> x._standardize_data(); x._clean_data()
+            >>> parallel_sweep(x, windowSizes=(10, 20), windowForwards=(10, 20, 30))
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+from dataclasses import dataclass
+from itertools import product
+from multiprocessing import Pool, shared_memory
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from .constants import COLUMNS_TIME, STANDARD_SPEED_COLUMNS, STANDARD_SPACING_COLUMNS
+from .generic import (
+    compute_statistics,
+    detect_transition_times,
+    compute_reaction_instants,
+    response_time_table,
+)
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class SharedRunSpec:
+    """
+        Picklable description of a run stored in shared memory
+    """
+
+    name: str
+    shape: tuple
+    columns: tuple
+    experiment: str = ""
+
+    def attach(self):
+        """
+            Attach to the shared block. Returns the block (to be closed by the caller) and a frame viewing its memory
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        array = np.ndarray(self.shape, dtype=float, buffer=shm.buf)
+        array.flags.writeable = False
+        return shm, pd.DataFrame(array, columns=list(self.columns), copy=False)
+
+
+class SharedRun:
+    """
+        Owner of the shared memory block of a run. The block is released with ``close`` (or when leaving a ``with`` statement).
+
+        Example:
+            Share a cleaned run ::
+
+                >>> with SharedRun(x.data, "data5") as shared:
+                ...     shared.spec
+    """
+
+    def __init__(self, data, experiment=""):
+        columns = COLUMNS_TIME + [col for col in STANDARD_SPEED_COLUMNS + STANDARD_SPACING_COLUMNS if col in data.columns]
+        array = data[columns].to_numpy(dtype=float)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=float, buffer=self._shm.buf)[:] = array
+        self.spec = SharedRunSpec(self._shm.name, array.shape, tuple(columns), experiment)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.spec.experiment}, {self.spec.shape})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _sweep_task(task):
+    """
+        Worker: response times of a shared run for one (windowSize, windowForward)
+    """
+    spec, windowSize, windowForward, engine, reference = task
+    shm, data = spec.attach()
+    try:
+        compute_statistics(data, windowSize, engine=engine)
+        events = detect_transition_times(data, windowForward, engine)
+    finally:
+        del data
+        shm.close()
+
+    rtdf = response_time_table(compute_reaction_instants(events), reference)
+    rtdf.insert(0, "windowForward", windowForward)
+    rtdf.insert(0, "windowSize", windowSize)
+    rtdf.insert(0, "experiment", spec.experiment)
+    return rtdf
+
+
+def parallel_sweep(
+    experiments, windowSizes=(10,), windowForwards=(20,), engine="numpy", reference="leader", processes=None
+):
+    """
+        Response times of one or several runs for all the (windowSize, windowForward) combinations, computed in a process pool over shared memory.
+
+        Args:
+            experiments(DataHandler, list): Runs already standardized and cleaned
+            windowSizes(tuple): Values of ``windowSize`` for ``compute_statistics``
+            windowForwards(tuple): Values of ``windowForward`` for ``detect_transition_times``
+            engine(str): Compute backend (see engines.py)
+            reference(str): ``leader`` for response times (i-1, i), ``head`` for response times (0, i)
+            processes(int): Number of workers (``os.cpu_count()`` by default)
+
+        Returns:
+            Long DataFrame ``experiment``, ``windowSize``, ``windowForward``, ``Platoon ID``, ``Response time``
+    """
+    if not isinstance(experiments, (list, tuple)):
+        experiments = [experiments]
+
+    shared = [SharedRun(e.data, e.datahandler._experiment) for e in experiments]
+    try:
+        tasks = [
+            (run.spec, windowSize, windowForward, engine, reference)
+            for run, windowSize, windowForward in product(shared, windowSizes, windowForwards)
+        ]
+        with Pool(processes) as pool:
+            results = pool.map(_sweep_task, tasks)
+    finally:
+        for run in shared:
+            run.close()
+
+    return pd.concat(results, ignore_index=True)
@@ -41,6 +41,7 @@ from .constants import (
     changes,
     detection,
 )
+from .schema import read_csv
 #from .generic import standardize_dataframe, compute_statistics, detect_transition_times, consecutive_times
 
 @dataclass
@@ -153,9 +154,11 @@ class POCData:
     # LOCAL METHODS
     # ============================================================================
 
-    def _load_data_from_csv(self, csv_path: str = ""):
+    def _load_data_from_csv(self, csv_path: str = "", features: list = None):
         """
-        Load csv data from the full path.
+        Load csv data from the full path. Time, speed and spacing columns are
+        always loaded, ``features`` adds columns or per vehicle variables of
+        the dataset schema (see schema.py)
 
         Examples:
             Loading a file in `csvpath`::
@@ -166,7 +169,7 @@ class POCData:
         self._csvpath = csv_path if not self._csvpath else self._csvpath
         self._experiment = self._csvpath.split("/")[-1].split(".")[-2]
         cols_to_load = COLUMNS_SPACING_POC + COLUMNS_SPEED_POC + COLUMNS_TIME_POC
-        self._csvdata = pd.read_csv(self._csvpath, usecols=cols_to_load, sep=",", decimal=".")
+        self._csvdata = read_csv(self._csvpath, cols_to_load, features, dataset="poc")
         
         #self._csvdata[["Day", "Heure"]] = self._csvdata[
          #   "bin_utc_time_formatted"
@@ -0,0 +1,275 @@
+"""
+    This module provides the data schema of the raw datasets and a typed csv reader.
+
+    The schema is compiled from the ``Data Elements.xlsx`` workbook shipped with each dataset (one row per variable, with its units), per vehicle variables are expanded to the column names of the csv files. The compiled schema is cached as ``schema.json`` next to the workbook and rebuilt when the workbook or the constants describing the csv files change.
+
+    The schema gives the data type of every column, so csv files are read with explicit types (Arrow multithreaded engine when ``pyarrow`` is installed) and only the columns of the requested features.
+
+    Example:
+        To load the speed and the acceleration of all the vehicles ::
+
+            >>> from collector.schema import read_csv
+            >>> read_csv('data/raw/carma/data5.csv', ['Time'], features=['GPS_CARMA_speed', 'acceleration'])
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import os
+import json
+import hashlib
+import warnings
+from dataclasses import dataclass, field
+from functools import lru_cache
+import pandas as pd
+
+try:
+    import pyarrow.csv  # noqa: F401
+
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from .constants import (
+    VEHICLES,
+    DATA_ELEMENTS,
+    CARMA_CSV_ELEMENTS,
+    CARMA_CSV_VEHICLE_ELEMENTS,
+    POC_RUN_ELEMENTS,
+    DCT_UNITS_DTYPE,
+    TEXT_ELEMENTS,
+)
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+SCHEMA_CACHE = "schema.json"
+
+# Layout of the workbook of each dataset
+DATASETS = {
+    "carma": {
+        "sheet": "Data Elements",
+        "name": "Variable Name",
+        "each": "Used for Each Vehicle?",
+        "pattern": "{vehicle}_{variable}",
+    },
+    "poc": {
+        "sheet": "DataElements",
+        "name": "Field Name",
+        "each": None,
+        "pattern": "{variable}_{vehicle}",
+    },
+}
+
+
+def schema_signature():
+    """
+        Hash of the code constants the compiled schema depends on, a cached schema compiled with other constants is rebuilt
+    """
+    constants = [
+        VEHICLES,
+        CARMA_CSV_ELEMENTS,
+        CARMA_CSV_VEHICLE_ELEMENTS,
+        POC_RUN_ELEMENTS,
+        DCT_UNITS_DTYPE,
+        TEXT_ELEMENTS,
+        DATASETS,
+    ]
+    return hashlib.sha256(json.dumps(constants, sort_keys=True).encode()).hexdigest()
+
+
+def units_dtype(variable, units):
+    """
+        Data type of a variable from its units
+    """
+    if variable in TEXT_ELEMENTS:
+        return "string"
+    units = str(units).strip().lower() if isinstance(units, str) else "none"
+    return DCT_UNITS_DTYPE.get(units, "float64")
+
+
+@dataclass
+class DataSchema:
+    """
+        Compiled schema of a dataset
+
+        Args:
+            columns(dict): ``{column: dtype}`` for every column of the csv files
+            variables(dict): ``{variable: [columns]}`` per vehicle variables and their columns (leader to tail)
+            source_mtime(float): Modification time of the workbook compiled
+            signature(str): Constants the schema was compiled with (see ``schema_signature``)
+    """
+
+    dataset: str
+    columns: dict = field(default_factory=dict)
+    variables: dict = field(default_factory=dict)
+    source_mtime: float = 0.0
+    signature: str = ""
+
+    def add(self, variable, units, each=False):
+        dtype = units_dtype(variable, units)
+        if each:
+            pattern = DATASETS[self.dataset]["pattern"]
+            names = [pattern.format(vehicle=vehicle, variable=variable) for vehicle in VEHICLES]
+            self.variables[variable] = names
+            self.columns.update(dict.fromkeys(names, dtype))
+        else:
+            self.columns[variable] = dtype
+
+    def select(self, features):
+        """
+            Columns of a set of features, either column names or per vehicle variables (``GPS_CARMA_speed``, ``speed_CACC``, ...)
+        """
+        columns = []
+        for feature in features:
+            if feature in self.variables:
+                names = self.variables[feature]
+            elif feature in self.columns:
+                names = [feature]
+            else:
+                raise KeyError(f"'{feature}' is not described in the {self.dataset} schema")
+            columns += [col for col in names if col not in columns]
+        return columns
+
+    def dtypes(self, columns=None):
+        """
+            ``{column: dtype}`` of the described columns among ``columns`` (all by default)
+        """
+        if columns is None:
+            return dict(self.columns)
+        return {col: self.columns[col] for col in columns if col in self.columns}
+
+    def to_json(self):
+        return json.dumps(
+            {
+                "dataset": self.dataset,
+                "columns": self.columns,
+                "variables": self.variables,
+                "source_mtime": self.source_mtime,
+                "signature": self.signature,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(**json.loads(text))
+
+
+def compile_schema(workbook, dataset):
+    """
+        Compile the schema of a dataset from its ``Data Elements.xlsx`` workbook (requires ``openpyxl``)
+    """
+    layout = DATASETS[dataset]
+    elements = pd.read_excel(workbook, sheet_name=layout["sheet"])
+    elements = elements[elements[layout["name"]].notna()]
+
+    schema = DataSchema(dataset, source_mtime=os.path.getmtime(workbook), signature=schema_signature())
+    for _, element in elements.iterrows():
+        variable = str(element[layout["name"]]).strip()
+        if dataset == "carma":
+            each = str(element[layout["each"]]).strip().lower() == "yes"
+            schema.add(variable, element["Units"], each)
+        else:
+            # PoC fields are logged per vehicle, fields common to the run are also kept as such
+            schema.add(variable, element["Units"])
+            if variable not in POC_RUN_ELEMENTS:
+                schema.add(variable, element["Units"], each=True)
+
+    if dataset == "carma":
+        for variable, units in CARMA_CSV_ELEMENTS.items():
+            schema.add(variable, units)
+        for variable, units in CARMA_CSV_VEHICLE_ELEMENTS.items():
+            schema.add(variable, units, each=True)
+    return schema
+
+
+def experiment_mode(csvpath, root=None):
+    """
+        Control mode of a run from its path: ``carma`` or the folder of the PoC run (``acc``, ``cacc``, ``hybrid``).
+
+        With ``root`` (the raw data folder), the mode is read from the path relative to it (``carma/<run>.csv`` or ``poc/<mode>/<run>.csv``), otherwise from the folder of the run. Parent folders of the data are never looked at.
+    """
+    if root is not None:
+        parts = os.path.normpath(os.path.relpath(csvpath, root)).split(os.sep)
+        if parts[0] == "carma":
+            return "carma"
+        if parts[0] == "poc" and len(parts) > 2:
+            return parts[1]
+    return os.path.basename(os.path.dirname(os.path.abspath(csvpath)))
+
+
+def find_workbook(csvpath):
+    """
+        Path to the ``Data Elements.xlsx`` of a csv file (same folder or its parent), ``None`` if missing
+    """
+    folder = os.path.dirname(os.path.abspath(csvpath))
+    for candidate in (folder, os.path.dirname(folder)):
+        workbook = os.path.join(candidate, DATA_ELEMENTS)
+        if os.path.exists(workbook):
+            return workbook
+    return None
+
+
+@lru_cache(maxsize=None)
+def _load_schema(workbook, dataset, mtime):
+    cache = os.path.join(os.path.dirname(workbook), SCHEMA_CACHE)
+    if os.path.exists(cache):
+        with open(cache) as f:
+            schema = DataSchema.from_json(f.read())
+        if schema.dataset == dataset and schema.source_mtime == mtime and schema.signature == schema_signature():
+            return schema
+
+    schema = compile_schema(workbook, dataset)
+    try:
+        with open(cache, "w") as f:
+            f.write(schema.to_json())
+    except OSError:
+        # Read-only data folder, the schema is kept in memory only
+        pass
+    return schema
+
+
+def load_schema(csvpath, dataset=None):
+    """
+        Schema of the dataset of a csv file (``carma`` or ``poc``, from the path by default, see ``experiment_mode``), ``None`` if the workbook is missing or cannot be compiled (e.g. ``openpyxl`` not installed), the csv file is then read without explicit types.
+
+        The compiled schema is read from the cache unless the workbook or the constants of the schema (see ``schema_signature``) have been modified since.
+    """
+    workbook = find_workbook(csvpath)
+    if workbook is None:
+        return None
+    if dataset is None:
+        dataset = "carma" if experiment_mode(csvpath) == "carma" else "poc"
+    try:
+        return _load_schema(workbook, dataset, os.path.getmtime(workbook))
+    except (ImportError, ValueError, KeyError) as error:
+        warnings.warn(f"Could not compile the schema of {workbook}, reading without explicit types: {error}")
+        return None
+
+
+def read_csv(csvpath, columns=None, features=None, engine=None, dataset=None):
+    """
+        Read a csv file with the data types of its schema.
+
+        Args:
+            csvpath(str): Path to the csv file
+            columns(list): Columns to load (all by default)
+            features(list): Additional features to load, column names or per vehicle variables (see ``DataSchema.select``)
+            engine(str): Parser passed to ``pd.read_csv``, Arrow when available by default
+            dataset(str): ``carma`` or ``poc`` (from the path by default)
+    """
+    schema = load_schema(csvpath, dataset)
+    if features:
+        extra = schema.select(features) if schema is not None else list(features)
+        columns = list(columns or [])
+        columns += [col for col in extra if col not in columns]
+
+    dtype = schema.dtypes(columns) if schema is not None else None
+    return pd.read_csv(csvpath, usecols=columns, dtype=dtype, engine=engine or CSV_ENGINE)
@@ -0,0 +1,240 @@
+"""
+    This module provides mergeable summary statistics of the response times over a corpus of runs.
+
+    Each run is reduced to per (mode, position) partial summaries (Welford moments and a quantile sketch). Partial summaries merge associatively, so a corpus is aggregated one run at a time with flat memory, and summaries computed on different machines can be combined.
+
+    Example:
+        To summarize the PoC runs per control mode ::
+
+            >>> from glob import glob
+            >>> from collector.summary import summarize_runs
+            >>> summary = summarize_runs(glob('data/raw/poc/*/*.csv'), windowSize=20)
+            >>> summary.to_frame()
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import json
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+# Maximum number of weighted points kept by the quantile sketch
+SKETCH_CAPACITY = 1000
+
+
+@dataclass
+class RunningMoments:
+    """
+        Count, mean and sum of squared deviations (Welford). Merged with the parallel formula from Chan et al.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            batch_mean = values.mean()
+            self.merge(RunningMoments(len(values), batch_mean, ((values - batch_mean) ** 2).sum()))
+        return self
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.count = count
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+@dataclass
+class QuantileSketch:
+    """
+        Weighted points sketch of a distribution.
+
+        Exact until ``capacity`` points are held, above that points are sorted and compressed into ``capacity`` buckets of equal weight (weighted mean value).
+    """
+
+    capacity: int = SKETCH_CAPACITY
+    values: np.ndarray = field(default_factory=lambda: np.empty(0))
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        return self._extend(values, np.ones(len(values)))
+
+    def merge(self, other):
+        return self._extend(other.values, other.weights)
+
+    def _extend(self, values, weights):
+        self.values = np.concatenate([self.values, values])
+        self.weights = np.concatenate([self.weights, weights])
+        if len(self.values) > self.capacity:
+            self._compress()
+        return self
+
+    def _compress(self):
+        order = np.argsort(self.values, kind="stable")
+        values, weights = self.values[order], self.weights[order]
+        cumulative = np.cumsum(weights)
+        bucket = np.minimum((cumulative - weights / 2) * self.capacity // cumulative[-1], self.capacity - 1).astype(int)
+        total = np.bincount(bucket, weights, minlength=self.capacity)
+        moment = np.bincount(bucket, weights * values, minlength=self.capacity)
+        keep = total > 0
+        self.values, self.weights = moment[keep] / total[keep], total[keep]
+
+    def quantile(self, q):
+        """
+            Quantile ``q`` (0-1) with linear interpolation, same convention as ``pd.Series.quantile`` for unit weights
+        """
+        if not len(self.values):
+            return np.nan
+        order = np.argsort(self.values, kind="stable")
+        values, weights = self.values[order], self.weights[order]
+        positions = np.cumsum(weights) - (weights + 1) / 2
+        return float(np.interp(q * (weights.sum() - 1), positions, values))
+
+
+@dataclass
+class SummaryStatistics:
+    """
+        Partial summary of the response times of one (mode, position)
+    """
+
+    moments: RunningMoments = field(default_factory=RunningMoments)
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def update(self, values):
+        self.moments.update(values)
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def to_dict(self):
+        return {
+            "count": self.moments.count,
+            "mean": self.moments.mean,
+            "m2": self.moments.m2,
+            "capacity": self.sketch.capacity,
+            "values": self.sketch.values.tolist(),
+            "weights": self.sketch.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, dct):
+        return cls(
+            RunningMoments(dct["count"], dct["mean"], dct["m2"]),
+            QuantileSketch(dct["capacity"], np.asarray(dct["values"], dtype=float), np.asarray(dct["weights"], dtype=float)),
+        )
+
+
+class CorpusSummary:
+    """
+        Mergeable summaries of response times keyed by (mode, position)
+
+        Example:
+            Combine the partial summaries of two machines ::
+
+                >>> total = CorpusSummary.from_json(part1).merge(CorpusSummary.from_json(part2))
+                >>> total.to_frame()
+    """
+
+    def __init__(self):
+        self._summaries = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({sorted(self._summaries)})"
+
+    def __getitem__(self, key):
+        return self._summaries[key]
+
+    def add_run(self, mode: str, rtdf: pd.DataFrame):
+        """
+            Add the response times of one run (long format ``Platoon ID``, ``Response time``, see ``generic.response_time_table``)
+        """
+        for position, values in rtdf.groupby("Platoon ID")["Response time"]:
+            self._summaries.setdefault((mode, position), SummaryStatistics()).update(values.to_numpy())
+        return self
+
+    def merge(self, other):
+        for key, summary in other._summaries.items():
+            self._summaries.setdefault(key, SummaryStatistics()).merge(summary)
+        return self
+
+    def to_frame(self, quantiles=(0.25, 0.5, 0.75)):
+        """
+            Summary table: rows are platoon positions, columns are (mode, statistic)
+        """
+        records = []
+        for (mode, position), summary in self._summaries.items():
+            record = {
+                "Mode": mode,
+                "Platoon ID": position,
+                "Mean": summary.moments.mean if summary.moments.count else np.nan,
+                "Std": summary.moments.std,
+                "Count": summary.moments.count,
+            }
+            for q in quantiles:
+                record[f"Q{q * 100:g}"] = summary.sketch.quantile(q)
+            records.append(record)
+        if not records:
+            return pd.DataFrame()
+        dfSummary = pd.DataFrame(records).set_index(["Mode", "Platoon ID"]).sort_index()
+        return dfSummary.unstack("Mode").swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+    def to_json(self):
+        return json.dumps(
+            [{"mode": mode, "position": position, **summary.to_dict()} for (mode, position), summary in self._summaries.items()]
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        corpus = cls()
+        for dct in json.loads(text):
+            corpus._summaries[(dct["mode"], dct["position"])] = SummaryStatistics.from_dict(dct)
+        return corpus
+
+
+def summarize_runs(csvpaths, reference="leader", **kwargs):
+    """
+        Compute the response time summaries of a set of runs, one run in memory at a time.
+
+        Args:
+            csvpaths(list): Paths to the runs, the mode is taken from the path (see ``experiment_mode``)
+            reference(str): ``leader`` for response times (i-1, i), ``head`` for response times (0, i)
+            kwargs: Passed to ``DataHandler.compute_response_times``
+    """
+    from .generic import response_time_table
+    from .handler import DataHandler, experiment_mode
+
+    corpus = CorpusSummary()
+    for csvpath in csvpaths:
+        experiment = DataHandler(csvpath)
+        experiment.compute_response_times(**kwargs)
+        rtdf = response_time_table(experiment._compute_reaction_timeinstants(), reference)
+        corpus.add_run(experiment_mode(csvpath), rtdf)
+    return corpus
@@ -0,0 +1,259 @@
+"""
+    This module provides a differential validation harness for accelerated implementations of the detection pipeline.
+
+    A candidate implementation (``compute_statistics``, ``detect_transition_times``, ``consecutive_times``) runs side by side with the pandas reference on the bundled CARMA runs and on synthetic traces. The harness diffs the statistics, the per vehicle changing/detection masks, the transition times and the response time tables, and reports the speedup.
+
+    Example:
+        Validate the numba engine ::
+
+            >>> from collector.validation import validate, engine_implementation
+            >>> validate(engine_implementation("numba"))
+
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import os
+import time
+from dataclasses import dataclass
+from functools import partial
+from glob import glob
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from .constants import (
+    STANDARD_SPEED_COLUMNS,
+    average_velocity,
+    stdev_velocity,
+    abs_derivative_sd_velocity,
+    derivative_velocity,
+    changes,
+    detection,
+)
+from .generic import (
+    standardize_dataframe,
+    clean_data,
+    compute_statistics,
+    detect_transition_times,
+    consecutive_times,
+    compute_reaction_instants,
+    compute_leader_follower_times,
+)
+
+# ============================================================================
+# CLASS AND DEFINITIONS
+# ============================================================================
+
+# Bundled CARMA runs, independent of the working directory
+CARMA_RUNS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "raw", "carma", "*.csv")
+
+
+@dataclass
+class Implementation:
+    """
+        Set of functions implementing the detection pipeline (same signatures as in ``generic.py``)
+    """
+
+    name: str
+    compute_statistics: Callable = compute_statistics
+    detect_transition_times: Callable = detect_transition_times
+    consecutive_times: Callable = consecutive_times
+
+    def run(self, dataExp, windowSize=10, windowForward=20):
+        """
+            Run the pipeline on a copy of ``dataExp``. Returns the processed data, the transition events, the response times and the elapsed time
+        """
+        data = dataExp.copy()
+        start = time.perf_counter()
+        self.compute_statistics(data, windowSize)
+        events = self.detect_transition_times(data, windowForward)
+        reaction_instants = compute_reaction_instants(events, self.consecutive_times)
+        response_times = compute_leader_follower_times(reaction_instants)
+        elapsed = time.perf_counter() - start
+        return data, events, response_times, elapsed
+
+
+def reference_implementation():
+    """
+        The pandas implementation used to produce the published response times
+    """
+    return Implementation("pandas")
+
+
+def engine_implementation(engine: str):
+    """
+        Implementation using one of the compute backends of engines.py
+    """
+    return Implementation(
+        engine,
+        partial(compute_statistics, engine=engine),
+        partial(detect_transition_times, engine=engine),
+    )
+
+
+def synthetic_run(
+    n_samples=4000, period=0.1, n_changes=6, delays=(0.5, 1.0, 0.8, 1.2), noise=0.02, seed=0, return_onsets=False
+):
+    """
+        Synthetic platoon trace: the leader alternates speed plateaus with ramps, each follower reproduces its predecessor's profile with a delay and measurement noise.
+
+        Returns a standardized and cleaned frame (``Time``, ``Speed - i``), and the true onsets of the ramps ``{vehid: times}`` if ``return_onsets``
+    """
+    rng = np.random.default_rng(seed)
+    time_grid = np.round(np.arange(n_samples) * period, 9)
+
+    # Leader: piecewise linear profile between random plateaus
+    knots = np.sort(rng.uniform(time_grid[0], time_grid[-1], size=2 * n_changes))
+    levels = np.repeat(rng.uniform(5, 30, size=n_changes + 1), 2)[1:-1]
+    knots = np.concatenate([[time_grid[0]], knots, [time_grid[-1]]])
+    levels = np.concatenate([[levels[0]], levels, [levels[-1]]])
+
+    data = {"Time": time_grid}
+    onsets = {}
+    lag = 0.0
+    for vehid, col in enumerate(STANDARD_SPEED_COLUMNS):
+        if vehid:
+            lag += delays[(vehid - 1) % len(delays)]
+        speed = np.interp(time_grid - lag, knots, levels) + rng.normal(0, noise, size=n_samples)
+        data[col] = np.clip(speed, 0, 50)
+        onsets[vehid] = knots[1:-1:2] + lag
+    if return_onsets:
+        return pd.DataFrame(data), onsets
+    return pd.DataFrame(data)
+
+
+def load_runs(pattern=CARMA_RUNS):
+    """
+        Standardized and cleaned bundled runs ``{experiment: data}``, raises ``FileNotFoundError`` if no run matches ``pattern``
+    """
+    from .handler import DataHandler
+
+    csvpaths = sorted(glob(pattern))
+    if not csvpaths:
+        raise FileNotFoundError(f"No run matches {pattern}")
+
+    runs = {}
+    for csvpath in csvpaths:
+        experiment = DataHandler(csvpath)
+        runs[experiment.datahandler._experiment] = clean_data(standardize_dataframe(experiment.data))
+    return runs
+
+
+def _unmatched_times(reference, candidate, tolerance):
+    """
+        Number of transition times without a counterpart within ``tolerance`` (both ways, per vehicle)
+    """
+    unmatched = 0
+    for vehid in range(5):
+        ref, cand = reference.times(vehid), candidate.times(vehid)
+        for a, b in ((ref, cand), (cand, ref)):
+            if not len(b):
+                unmatched += len(a)
+                continue
+            nearest = np.abs(a[:, None] - b[None, :]).min(axis=1) if len(a) else np.empty(0)
+            unmatched += int((nearest > tolerance).sum())
+    return unmatched
+
+
+def compare_run(dataExp, reference, candidate, windowSize=10, windowForward=20, **kwargs):
+    """
+        Run both implementations on one run and diff their outputs (see ``compare_outputs``).
+    """
+    return compare_outputs(
+        reference.run(dataExp, windowSize, windowForward), candidate.run(dataExp, windowSize, windowForward), **kwargs
+    )
+
+
+def compare_outputs(reference_output, candidate_output, atol=1e-7, time_tol=1e-9):
+    """
+        Diff the outputs of two implementations on the same run, as returned by ``Implementation.run`` (a reference output can be computed once and compared with several candidates).
+
+        Args:
+            atol(float): Tolerance on the statistics (the reference rolling std accumulates ~1e-8 of round-off)
+            time_tol(float): Tolerance on transition and response times (s)
+
+        Returns:
+            Dictionary with the divergences, the timings and the ``passed`` flag
+    """
+    ref_data, ref_transitions, ref_rt, ref_time = reference_output
+    cand_data, cand_transitions, cand_rt, cand_time = candidate_output
+
+    stat_diff, nan_mismatches = 0.0, 0
+    mask_mismatches = {"changes": 0, "detection": 0}
+    for vehid in range(5):
+        for col in (average_velocity, stdev_velocity, abs_derivative_sd_velocity, derivative_velocity):
+            ref = ref_data[col(vehid)].to_numpy(dtype=float)
+            cand = cand_data[col(vehid)].to_numpy(dtype=float)
+            both = ~np.isnan(ref) & ~np.isnan(cand)
+            nan_mismatches += int((np.isnan(ref) != np.isnan(cand)).sum())
+            if both.any():
+                stat_diff = max(stat_diff, float(np.abs(ref[both] - cand[both]).max()))
+        for kind, col in (("changes", changes), ("detection", detection)):
+            ref = ref_data[col(vehid)].fillna(False).to_numpy(dtype=bool)
+            cand = cand_data[col(vehid)].fillna(False).to_numpy(dtype=bool)
+            mask_mismatches[kind] += int((ref != cand).sum())
+
+    unmatched = _unmatched_times(ref_transitions, cand_transitions, time_tol)
+
+    same_shape = ref_rt.shape == cand_rt.shape
+    if same_shape and ref_rt.size:
+        rt_diff = float(np.nanmax(np.abs(ref_rt.to_numpy(dtype=float) - cand_rt.to_numpy(dtype=float)), initial=0))
+        rt_diff = rt_diff if (ref_rt.isna() == cand_rt.isna()).all().all() else np.inf
+    else:
+        rt_diff = 0.0 if same_shape else np.inf
+
+    return {
+        "Stats max abs diff": stat_diff,
+        "Stats NaN mismatches": nan_mismatches,
+        "Changes mismatches": mask_mismatches["changes"],
+        "Detection mismatches": mask_mismatches["detection"],
+        "Unmatched transitions": unmatched,
+        "Reaction chains (ref/cand)": f"{len(ref_rt) // 4}/{len(cand_rt) // 4}",
+        "Response time max diff": rt_diff,
+        "Reference (s)": ref_time,
+        "Candidate (s)": cand_time,
+        "Speedup": ref_time / cand_time if cand_time else np.inf,
+        "passed": (
+            stat_diff <= atol
+            and nan_mismatches == 0
+            and sum(mask_mismatches.values()) == 0
+            and unmatched == 0
+            and rt_diff <= time_tol
+        ),
+    }
+
+
+def validate(candidate, reference=None, runs=None, n_synthetic=3, windowSize=10, windowForward=20, **kwargs):
+    """
+        Differential validation of ``candidate`` against the reference on the bundled CARMA runs and on synthetic traces.
+
+        Args:
+            candidate(Implementation): Implementation to validate (see ``engine_implementation``)
+            reference(Implementation): pandas reference by default
+            runs(dict): ``{name: data}`` standardized and cleaned runs, bundled CARMA runs by default
+            n_synthetic(int): Number of synthetic traces added to the runs
+            kwargs: Tolerances passed to ``compare_run``
+
+        Returns:
+            DataFrame with one row per run
+    """
+    reference = reference_implementation() if reference is None else reference
+    runs = load_runs() if runs is None else dict(runs)
+    for seed in range(n_synthetic):
+        runs[f"synthetic{seed}"] = synthetic_run(seed=seed)
+
+    # Warm up (JIT compilation is not part of the timings)
+    candidate.run(synthetic_run(n_samples=200), windowSize, windowForward)
+
+    records = []
+    for name, dataExp in runs.items():
+        record = compare_run(dataExp, reference, candidate, windowSize, windowForward, **kwargs)
+        records.append({"Run": name, "Candidate": candidate.name, **record})
+    return pd.DataFrame(records).set_index("Run")
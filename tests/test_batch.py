@@ -0,0 +1,40 @@
+"""
+    Batched detection over runs of different lengths against the per run detection (see batch.py)
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import numpy as np
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from collector.batch import batched_detection
+from collector.generic import compute_statistics, detect_transition_times
+from collector.validation import synthetic_run
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+# Lengths spread over several batches, unsorted so that runs are reordered and padded
+LENGTHS = [1200, 300, 2800, 650, 45, 1900, 800, 2300, 500, 1500]
+
+
+def test_batched_matches_per_run():
+    runs = {f"run{r}": synthetic_run(n_samples=n, seed=r) for r, n in enumerate(LENGTHS)}
+    batched = batched_detection(runs, windowSize=10, windowForward=20, engine="numpy", batch_size=4)
+    assert list(batched) == list(runs)
+    assert sum(len(events) for events in batched.values()) > 0
+
+    for name, dataExp in runs.items():
+        data = dataExp.copy()
+        compute_statistics(data, 10, engine="numpy")
+        expected = detect_transition_times(data, 20, engine="numpy")
+        events = batched[name]
+        np.testing.assert_array_equal(events.offsets, expected.offsets, err_msg=name)
+        np.testing.assert_array_equal(events.index, expected.index, err_msg=name)
+        np.testing.assert_allclose(events.time, expected.time, err_msg=name)
@@ -0,0 +1,53 @@
+"""
+    Equivalence of the compute engines with the pandas reference on the bundled CARMA runs (see validation.py)
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import pytest
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from collector import engines
+from collector.validation import load_runs, compare_outputs, reference_implementation, engine_implementation
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+# (windowSize, windowForward) in samples and as time spans
+WINDOWS = [(10, 20), ("1s", "2s")]
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return load_runs()
+
+
+@pytest.fixture(scope="module", params=WINDOWS, ids=["samples", "time"])
+def windows(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def reference_outputs(runs, windows):
+    """
+        Outputs of the pandas reference, computed once per window for all the engines
+    """
+    reference = reference_implementation()
+    return {name: reference.run(dataExp, *windows) for name, dataExp in runs.items()}
+
+
+@pytest.mark.parametrize("engine", engines.ENGINES[1:])
+def test_engine_matches_reference(runs, reference_outputs, engine, windows):
+    if engine == "numba" and engines.numba is None:
+        pytest.skip("numba is not installed")
+
+    candidate = engine_implementation(engine)
+    for name, dataExp in runs.items():
+        report = compare_outputs(reference_outputs[name], candidate.run(dataExp, *windows))
+        assert report["passed"], f"{engine} diverges from pandas on {name}: {report}"
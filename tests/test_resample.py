@@ -0,0 +1,32 @@
+"""
+    Resampling of runs loaded with extra schema typed features (nullable ``Int64`` and ``boolean`` columns)
+"""
+
+# ============================================================================
+# STANDARD  IMPORTS
+# ============================================================================
+
+import os
+import numpy as np
+
+# ============================================================================
+# INTERNAL IMPORTS
+# ============================================================================
+
+from collector.handler import DataHandler
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+CARMA_RUN = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "carma", "data10.csv")
+
+
+def test_resample_with_extra_features():
+    experiment = DataHandler(CARMA_RUN, features=["CARMA_mode", "CARMA_ovr"])
+    experiment.compute_response_times(resample=0.1, engine="numpy")
+
+    for col in ("leader_CARMA_mode", "follower1_CARMA_ovr"):
+        assert col in experiment.data
+        assert experiment.data[col].dtype == float
+    assert np.allclose(np.diff(experiment.data["Time"]), 0.1)